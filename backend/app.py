@@ -1,41 +1,86 @@
 # backend/app.py
+import asyncio
 import logging
-import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
-from dotenv import load_dotenv
-from routers import suggestions, quotas, spotify_search
-
-load_dotenv()
 
 # --- Use direct imports since all modules are in /app within the container ---
-from database import connect_to_mongo, close_mongo_connection # Reverted
-from routers import suggestions, quotas, spotify_search       # Reverted
+from config import settings, configure_logging
+from database import (
+    connect_to_mongo,
+    close_mongo_connection,
+    get_suggestions_collection,
+    get_quotas_collection,
+    get_versions_collection,
+)
+from write_behind import start_suggestion_writer, stop_suggestion_writer
+from cache import close_cache
+from routers import suggestions, quotas, spotify_search
 # --- End Import Change ---
 
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 
-# --- Lifespan Management ---
+# --- Startup Checks ---
+async def warm_up_spotify():
+    """Imports the Spotify client and fetches a token so the first search doesn't pay for it."""
+    try:
+        from spotify import get_token
+        await get_token()
+    except Exception as e:
+        logger.warning(f"Spotify warm-up failed: {e}")
 
-# (Keep the lifespan function as it was in the previous correct version)
+async def start_recommendations():
+    """Imports NumPy and loads the recommendations snapshot once the app is already serving."""
+    from recommendations import start_recommendations_refresh
+    start_recommendations_refresh(get_suggestions_collection())
+
+async def ensure_indexes():
+    """Creates the indexes the ranking queries need (a no-op when they exist) without delaying startup."""
+    try:
+        from ranking import ensure_ranking_indexes
+        await ensure_ranking_indexes(get_suggestions_collection())
+    except Exception as e:
+        logger.error(f"Could not create ranking indexes: {e}")
+
+
+# --- Lifespan Management ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Application startup...")
+    # The Spotify warm-up runs alongside the MongoDB check but never delays serving.
+    warm_up_task = asyncio.create_task(warm_up_spotify())
+    recommendations_task = None
+    indexes_task = None
     # Store client on app state for potential use in health check etc.
-    mongo_client_instance = await connect_to_mongo() # Get the client from connect
+    mongo_client_instance = await connect_to_mongo(timeout=settings.startup_check_timeout)
     if mongo_client_instance:
         app.state.mongodb_client = mongo_client_instance
         logger.info("MongoDB client stored in app state.")
+        if settings.write_behind_enabled:
+            start_suggestion_writer(get_suggestions_collection(), get_quotas_collection(), get_versions_collection())
+        recommendations_task = asyncio.create_task(start_recommendations())
+        indexes_task = asyncio.create_task(ensure_indexes())
     else:
         app.state.mongodb_client = None
-        logger.warning("MongoDB client connection failed, not stored in app state.")
+        logger.warning("MongoDB client could not be created, not stored in app state.")
     yield
     logger.info("Application shutdown...")
+    warm_up_task.cancel()
+    if indexes_task:
+        indexes_task.cancel()
+    if recommendations_task:
+        recommendations_task.cancel()
+        from recommendations import stop_recommendations_refresh
+        stop_recommendations_refresh()
+    # Flush queued suggestions before the MongoDB client goes away
+    await stop_suggestion_writer()
     # Pass the client instance if close_mongo_connection expects it
     await close_mongo_connection(getattr(app.state, 'mongodb_client', None))
+    await close_cache()
 
 # --- FastAPI App Instance ---
 app = FastAPI(
@@ -46,10 +91,9 @@ app = FastAPI(
 )
 
 # --- CORS Configuration ---
-# (Keep CORS config as is)
 origins = [
     "http://localhost:3000",
-    os.environ.get("FRONTEND_URL", None),
+    settings.frontend_url,
 ]
 origins = [origin for origin in origins if origin]
 if not origins:
@@ -62,16 +106,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"], # Lets the frontend send If-None-Match on the next request
 )
 
+# --- Response Compression ---
+# Brotli when the optional `brotli-asgi` package is installed (it falls back to gzip for
+# clients that don't accept br); otherwise gzip. Small responses aren't worth compressing.
+COMPRESSION_MINIMUM_SIZE = 1000
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
+
 # --- Include Routers ---
-# (Keep routers included with prefixes)
 app.include_router(spotify_search.router, prefix="/spotify", tags=["Spotify"]) # Prefix is important!
 app.include_router(suggestions.router, prefix="/suggestions", tags=["Suggestions"])
 app.include_router(quotas.router, prefix="/quota", tags=["Quota"])
 
 # --- Root and Health Endpoints ---
-# (Keep root and health check endpoints as is)
 @app.get("/", tags=["Root"])
 async def read_root():
     return {"message": "Welcome to Barry's Song Suggestion API - POC"}
@@ -0,0 +1,196 @@
+# backend/archive.py
+# Moves resolved (approved/rejected) suggestions older than ARCHIVE_AFTER_DAYS out of the
+# hot `suggestions` collection into monthly `suggestions_archive_YYYY_MM` collections.
+#
+#   cd backend && python archive.py    # run from cron, e.g. nightly
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError
+
+from config import settings
+from versions import bump_suggestions
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PREFIX = "suggestions_archive_"
+RESOLVED_STATUSES = ["approved", "rejected"]
+DUPLICATE_KEY_ERROR = 11000
+ARCHIVE_NAMES_TTL = 60 # Seconds a worker trusts its list of existing archive collections
+
+
+def archive_collection_name(date: datetime) -> str:
+    return f"{ARCHIVE_PREFIX}{date:%Y_%m}"
+
+def archive_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Resolved suggestions older than this are (or will be) in the archive collections."""
+    return (now or datetime.utcnow()) - timedelta(days=settings.archive_after_days)
+
+def archive_months(since: datetime, until: datetime) -> list[str]:
+    """Archive collection names for every month from `since` to `until`, newest first."""
+    names = []
+    year, month = until.year, until.month
+    while (year, month) >= (since.year, since.month):
+        names.append(f"{ARCHIVE_PREFIX}{year:04d}_{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return names
+
+
+# --- Existing Archives ---
+# Range queries only read archive collections that exist. The list is cached per process;
+# the archive job refreshes its own copy, workers pick up new months within ARCHIVE_NAMES_TTL.
+_archive_names: set[str] = set()
+_archive_names_loaded_at = float("-inf")
+
+async def existing_archive_collections(db: AsyncIOMotorDatabase, refresh: bool = False) -> set[str]:
+    global _archive_names, _archive_names_loaded_at
+    if refresh or time.monotonic() - _archive_names_loaded_at >= ARCHIVE_NAMES_TTL:
+        names = await db.list_collection_names(filter={"name": {"$regex": f"^{ARCHIVE_PREFIX}"}})
+        _archive_names, _archive_names_loaded_at = set(names), time.monotonic()
+    return _archive_names
+
+def oldest_archive_month(names: set[str]) -> Optional[datetime]:
+    """First day of the oldest archived month (names sort chronologically)."""
+    if not names:
+        return None
+    year, month = min(names).removeprefix(ARCHIVE_PREFIX).split("_")
+    return datetime(int(year), int(month), 1)
+
+
+# --- Archival Job ---
+async def archive_resolved_suggestions(
+    db: AsyncIOMotorDatabase,
+    batch_size: Optional[int] = None,
+) -> int:
+    """Copies old resolved suggestions into their monthly archive, then deletes them.
+
+    Works in batches. Each batch is copied before it is deleted, and copies ignore duplicate
+    keys, so an interrupted run can simply be repeated. Returns the number of suggestions moved.
+    The age comes from ARCHIVE_AFTER_DAYS, the same setting the API uses to decide when a
+    query has to look in the archive.
+    """
+    batch_size = batch_size or settings.archive_batch_size
+    cutoff = archive_cutoff()
+    suggestions_coll = db["suggestions"]
+    archive_filter = {"status": {"$in": RESOLVED_STATUSES}, "suggestion_date": {"$lt": cutoff}}
+    logger.info(f"Archiving resolved suggestions older than {cutoff:%Y-%m-%d} in batches of {batch_size}...")
+
+    # Each batch is an index range scan (the $in over two statuses is merge-sorted by date)
+    # rather than a collection scan plus in-memory sort
+    await suggestions_coll.create_index([("status", 1), ("suggestion_date", 1)])
+
+    moved = 0
+    prepared_collections: set[str] = set()
+    while True:
+        batch = await suggestions_coll.find(archive_filter).sort("suggestion_date", 1).to_list(length=batch_size)
+        if not batch:
+            break
+
+        by_month: dict[str, list[dict]] = {}
+        for doc in batch:
+            by_month.setdefault(archive_collection_name(doc["suggestion_date"]), []).append(doc)
+
+        for name, docs in by_month.items():
+            archive_coll = db[name]
+            if name not in prepared_collections:
+                await archive_coll.create_index([("instructor_id", 1), ("suggestion_date", DESCENDING)])
+                await archive_coll.create_index([("class_id", 1), ("suggestion_date", DESCENDING)])
+                prepared_collections.add(name)
+            try:
+                await archive_coll.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # Already copied by an earlier, interrupted run
+                if any(error.get("code") != DUPLICATE_KEY_ERROR for error in e.details.get("writeErrors", [])):
+                    raise
+
+        # Only delete what was copied, and only if it's still resolved
+        delete_result = await suggestions_coll.delete_many({
+            "_id": {"$in": [doc["_id"] for doc in batch]},
+            "status": {"$in": RESOLVED_STATUSES},
+        })
+        moved += delete_result.deleted_count
+        # Listings without a date range no longer include these suggestions
+        await bump_suggestions(db["cache_versions"], batch)
+        logger.info(f"Archived {moved} suggestions so far...")
+
+    await existing_archive_collections(db, refresh=True)
+    logger.info(f"Archival finished. Moved {moved} suggestions.")
+    return moved
+
+
+# --- Range Queries ---
+def _as_naive_utc(date: Optional[datetime]) -> Optional[datetime]:
+    # MongoDB hands back naive UTC datetimes; query parameters may carry an offset
+    if date and date.tzinfo:
+        return date.astimezone(timezone.utc).replace(tzinfo=None)
+    return date
+
+async def find_suggestions_in_range(
+    suggestions_coll: AsyncIOMotorCollection,
+    query_filter: dict,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+    session: Optional[AsyncIOMotorClientSession] = None,
+) -> list[dict]:
+    """Finds suggestions newest first, reading archive collections only when the range needs them.
+
+    The hot collection is always queried. Archives are added only when `since` reaches back past
+    the archive cutoff and the filter can match resolved suggestions, and only those that exist:
+    a `since` far in the past costs no more than one query per archived month.
+    """
+    since, until = _as_naive_utc(since), _as_naive_utc(until)
+    date_filter = {}
+    if since:
+        date_filter["$gte"] = since
+    if until:
+        date_filter["$lte"] = until
+    ranged_filter = {**query_filter, "suggestion_date": date_filter} if date_filter else query_filter
+
+    collections = [suggestions_coll]
+    cutoff = archive_cutoff()
+    if since and since < cutoff and query_filter.get("status") != "pending":
+        db = suggestions_coll.database
+        existing = await existing_archive_collections(db)
+        if existing:
+            months = archive_months(max(since, oldest_archive_month(existing)), min(until or cutoff, cutoff))
+            for name in months:
+                if name in existing:
+                    collections.append(db.get_collection(name, read_preference=suggestions_coll.read_preference))
+
+    def find(coll: AsyncIOMotorCollection):
+        return coll.find(ranged_filter, session=session).sort("suggestion_date", DESCENDING).to_list(length=limit)
+
+    if session:
+        # A session runs one operation at a time
+        results = [await find(coll) for coll in collections]
+    else:
+        results = await asyncio.gather(*(find(coll) for coll in collections))
+    if len(results) == 1:
+        return results[0]
+    # Each list is already sorted newest first; merge and keep the newest `limit`
+    merged = heapq.merge(*results, key=lambda doc: doc["suggestion_date"], reverse=True)
+    return [doc for _, doc in zip(range(limit), merged)]
+
+
+if __name__ == "__main__":
+    from config import configure_logging
+    from database import connect_to_mongo, close_mongo_connection, get_database
+
+    async def run_archival():
+        client = await connect_to_mongo()
+        if not client:
+            logger.error("MongoDB connection failed, cannot archive suggestions")
+            return
+        try:
+            await archive_resolved_suggestions(get_database())
+        finally:
+            await close_mongo_connection(client)
+
+    configure_logging()
+    asyncio.run(run_archival())
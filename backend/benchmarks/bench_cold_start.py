@@ -0,0 +1,82 @@
+# backend/benchmarks/bench_cold_start.py
+# Measures backend cold start: the time to import the app module, and the time from
+# launching uvicorn until the first request is answered. Exits non-zero when either
+# exceeds its budget, so it can run in CI as a startup-time regression check (the same
+# check runs under pytest in tests/test_cold_start.py).
+#
+# The MongoDB startup check is bounded by STARTUP_CHECK_TIMEOUT; this benchmark lowers it
+# (unless already set) so the budget holds whether or not MongoDB is reachable.
+#
+#   cd backend && python -m benchmarks.bench_cold_start --runs 5
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Budgets in seconds. Keep them loose enough for a CI runner but tight enough that a
+# heavy import at module level or a blocking startup call shows up.
+IMPORT_BUDGET = float(os.getenv("COLD_START_IMPORT_BUDGET", "1.5"))
+FIRST_REQUEST_BUDGET = float(os.getenv("COLD_START_FIRST_REQUEST_BUDGET", "3.0"))
+STARTUP_CHECK_TIMEOUT = "0.5"
+
+
+def cold_start_env() -> dict:
+    """Environment for the measured processes: the current one, with a short startup check."""
+    env = dict(os.environ)
+    env.setdefault("STARTUP_CHECK_TIMEOUT", STARTUP_CHECK_TIMEOUT)
+    return env
+
+
+def measure_import() -> float:
+    """Imports the app in a fresh interpreter and returns the wall time of the import."""
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=cold_start_env())
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def measure_first_request(port: int, timeout: float = 30.0) -> float:
+    """Starts uvicorn and returns the seconds until GET / succeeds."""
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        env=cold_start_env(),
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("Server did not answer within the timeout")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    import_times = [measure_import() for _ in range(args.runs)]
+    first_request_times = [measure_first_request(args.port) for _ in range(args.runs)]
+
+    import_median = statistics.median(import_times)
+    first_request_median = statistics.median(first_request_times)
+    print(f"import app:        median {import_median * 1000:8.1f} ms  (budget {IMPORT_BUDGET * 1000:.0f} ms)")
+    print(f"first request:     median {first_request_median * 1000:8.1f} ms  (budget {FIRST_REQUEST_BUDGET * 1000:.0f} ms)")
+
+    failed = import_median > IMPORT_BUDGET or first_request_median > FIRST_REQUEST_BUDGET
+    if failed:
+        print("Cold start budget exceeded.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
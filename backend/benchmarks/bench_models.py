@@ -0,0 +1,66 @@
+# backend/benchmarks/bench_models.py
+# Validate/serialize throughput of the API models (SongSuggestionInDB, QuotaRecordInDB):
+# model_validate from MongoDB documents, model_dump, model_dump_json and the list
+# TypeAdapter the suggestions listing uses.
+#
+#   cd backend && python -m benchmarks.bench_models --rows 100000
+import argparse
+import time
+from datetime import datetime
+from typing import List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from benchmarks.bench_records import synthetic_docs
+from models import QuotaRecordInDB, SongSuggestionInDB
+
+
+def quota_docs(rows: int) -> list[dict]:
+    month_year = datetime.utcnow().strftime("%Y-%m")
+    return [
+        {"_id": ObjectId(), "user_id": f"user_{i}", "month_year": month_year, "total_quota": 5, "remaining_quota": i % 6}
+        for i in range(rows)
+    ]
+
+
+def measure(label: str, fn, items: list):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    elapsed = time.perf_counter() - start
+    rate = len(items) / elapsed if elapsed else float("inf")
+    print(f"{label:<40} {elapsed:8.3f} s  {rate:12,.0f} rows/s  {elapsed / len(items) * 1e6:7.2f} us/row")
+
+
+def bench_model(model, docs: list[dict]):
+    name = model.__name__
+    measure(f"{name}.model_validate", model.model_validate, docs)
+    instances = [model.model_validate(d) for d in docs]
+    measure(f"{name}.model_dump", lambda m: m.model_dump(by_alias=True), instances)
+    measure(f"{name}.model_dump_json", lambda m: m.model_dump_json(by_alias=True), instances)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model validation/serialization benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=100, help="Rows per listing response (GET /suggestions limit)")
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} synthetic documents per model...")
+    bench_model(SongSuggestionInDB, synthetic_docs(args.rows))
+    bench_model(QuotaRecordInDB, quota_docs(args.rows))
+
+    # One listing response = validate a page of rows and dump it to JSON bytes
+    adapter = TypeAdapter(List[SongSuggestionInDB])
+    docs = synthetic_docs(args.rows)
+    pages = [docs[i:i + args.page] for i in range(0, len(docs), args.page)]
+    start = time.perf_counter()
+    for page in pages:
+        adapter.dump_json(adapter.validate_python(page), by_alias=True)
+    elapsed = time.perf_counter() - start
+    print(f"{f'list[{args.page}] validate + dump_json':<40} {elapsed:8.3f} s  {len(pages) / elapsed:12,.0f} pages/s  {elapsed / len(pages) * 1e3:7.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
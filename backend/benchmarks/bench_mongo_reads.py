@@ -0,0 +1,68 @@
+# backend/benchmarks/bench_mongo_reads.py
+# Compares read throughput of the suggestions listing query under different read
+# preferences. Point MONGODB_URI at a replica set, for example a local three-member set:
+#
+#   mongod --replSet rs0 --port 27017 --dbpath /tmp/rs0-0 &
+#   mongod --replSet rs0 --port 27018 --dbpath /tmp/rs0-1 &
+#   mongod --replSet rs0 --port 27019 --dbpath /tmp/rs0-2 &
+#   mongosh --eval 'rs.initiate({_id: "rs0", members: [
+#       {_id: 0, host: "localhost:27017"}, {_id: 1, host: "localhost:27018"}, {_id: 2, host: "localhost:27019"}]})'
+#
+#   cd backend && MONGODB_URI="mongodb://localhost:27017/?replicaSet=rs0" \
+#       python -m benchmarks.bench_mongo_reads --duration 10 --concurrency 128
+import argparse
+import asyncio
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Primary, SecondaryPreferred, Nearest
+
+from config import settings
+from database import client_options
+
+READ_PREFERENCES = {
+    "primary": Primary(),
+    "secondaryPreferred": SecondaryPreferred(),
+    "nearest": Nearest(),
+}
+
+
+async def run_reads(collection, duration: float, concurrency: int) -> float:
+    """Runs the instructor listing query from `concurrency` tasks; returns queries/second."""
+    completed = 0
+    deadline = time.monotonic() + duration
+
+    async def reader():
+        nonlocal completed
+        while time.monotonic() < deadline:
+            cursor = collection.find({"instructor_id": "instructor456"}).sort("suggestion_date", -1)
+            await cursor.to_list(length=100)
+            completed += 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(reader() for _ in range(concurrency)))
+    return completed / (time.monotonic() - start)
+
+
+async def main(duration: float, concurrency: int):
+    client = AsyncIOMotorClient(settings.mongo_uri, **client_options())
+    try:
+        hello = await client.admin.command("hello")
+        print(f"Replica set: {hello.get('setName', '(standalone)')}, hosts: {len(hello.get('hosts', [])) or 1}")
+        print(f"Pool size {settings.mongo_max_pool_size}, compressors '{settings.mongo_compressors or 'none'}'")
+        suggestions = client[settings.db_name]["suggestions"]
+        baseline = None
+        for name, preference in READ_PREFERENCES.items():
+            qps = await run_reads(suggestions.with_options(read_preference=preference), duration, concurrency)
+            baseline = baseline or qps
+            print(f"{name:<20} {qps:10.1f} queries/s  (x{qps / baseline:.2f})")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MongoDB read preference benchmark")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=128)
+    args = parser.parse_args()
+    asyncio.run(main(args.duration, args.concurrency))
@@ -0,0 +1,92 @@
+# backend/benchmarks/bench_ranking.py
+# Times the ranking path over synthetic pending suggestions (no database needed): decoding the
+# grouped rows the ranking aggregation returns, building the columns and scoring.
+# Target: 100k candidates ranked in well under 100 ms.
+#
+#   cd backend && python -m benchmarks.bench_ranking --candidates 100000 --k 20
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import bson
+import numpy as np
+from bson import ObjectId
+
+from ranking import EPOCH, RankingColumns, rank_candidates
+
+
+def synthetic_rows(candidates: int, tracks: int, artists: int, participants: int, seed: int = 7) -> list[dict]:
+    """Rows shaped like ranking_pipeline's output: one per track, suggesters newest first."""
+    rng = np.random.default_rng(seed)
+    # Zipf-like popularity so some tracks collect many votes
+    track_ids = (np.minimum(rng.zipf(1.3, candidates), tracks) - 1).tolist()
+    participant_ids = rng.integers(0, participants, candidates).tolist()
+    ages = sorted(rng.integers(0, 14 * 24 * 3600, candidates).tolist())
+    now_ms = int((datetime.utcnow() - EPOCH).total_seconds() * 1000)
+
+    # Visit suggestions newest first, as the pipeline's $sort/$group does
+    rows: dict[int, dict] = {}
+    for track, participant, age in zip(track_ids, participant_ids, ages):
+        row = rows.get(track)
+        if row is None:
+            row = rows[track] = {
+                "_id": f"spotify:track:{track}",
+                "suggestion_id": ObjectId(),
+                "newest": now_ms - age * 1000,
+                "artist_name": f"artist_{track % artists}",
+                "participants": [],
+            }
+        row["participants"].append(f"user_{participant}")
+    return list(rows.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranking benchmark")
+    parser.add_argument("--candidates", type=int, default=100_000)
+    parser.add_argument("--tracks", type=int, default=20_000)
+    parser.add_argument("--artists", type=int, default=3_000)
+    parser.add_argument("--participants", type=int, default=10_000)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.candidates, args.tracks, args.artists, args.participants)
+    # The cursor hands over BSON batches; decoding them is part of the measured path
+    raw = b"".join(bson.encode(row) for row in rows)
+    rng = np.random.default_rng(11)
+    rates = {f"user_{i}": float(r) for i, r in enumerate(rng.random(args.participants))}
+
+    def run():
+        decoded = bson.decode_all(raw)
+        t_decoded = time.perf_counter()
+        columns = RankingColumns.from_rows(decoded)
+        t_columns = time.perf_counter()
+        ranked = rank_candidates(columns, rates, args.k)
+        return ranked, t_decoded, t_columns
+
+    run() # Warm up
+    decode, build, score, total = [], [], [], []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        ranked, t_decoded, t_columns = run()
+        end = time.perf_counter()
+        decode.append((t_decoded - start) * 1000)
+        build.append((t_columns - t_decoded) * 1000)
+        score.append((end - t_columns) * 1000)
+        total.append((end - start) * 1000)
+
+    def summary(timings: list[float]) -> str:
+        return f"median {statistics.median(timings):6.1f} ms, p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:6.1f} ms"
+
+    print(f"{args.candidates} candidates ({len(rows)} tracks, {len(raw) / 2**20:.1f} MiB of BSON) -> top {len(ranked)}")
+    print(f"  decode rows:   {summary(decode)}")
+    print(f"  build columns: {summary(build)}")
+    print(f"  score + top k: {summary(score)}")
+    print(f"  total:         {summary(total)}  (excludes the database's own aggregation time)")
+    for track in ranked[:5]:
+        print(f"  {track.spotify_uri:<24} votes={track.votes:<5} score={track.score:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# backend/benchmarks/bench_records.py
+# Memory and build throughput of suggestion rows held in-process: raw MongoDB dicts,
+# SongSuggestionInDB models and SuggestionRecord slotted records.
+#
+#   cd backend && python -m benchmarks.bench_records --rows 1000000
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from models import SongSuggestionInDB
+from records import SuggestionRecord
+
+
+def synthetic_docs(rows: int) -> list[dict]:
+    now = datetime.utcnow()
+    statuses = ("pending", "approved", "rejected")
+    return [
+        {
+            "_id": ObjectId(),
+            "spotify_uri": f"spotify:track:{i % 50_000:022d}",
+            "song_name": f"Song {i % 50_000}",
+            "artist_name": f"Artist {i % 5_000}",
+            "album_cover_url": f"https://i.scdn.co/image/{i % 50_000:040d}",
+            "class_id": f"class_{i % 2_000}",
+            "participant_id": f"user_{i % 100_000}",
+            "instructor_id": f"instructor_{i % 200}",
+            "suggestion_date": now - timedelta(seconds=i),
+            "status": statuses[i % 3],
+        }
+        for i in range(rows)
+    ]
+
+
+def measure(label: str, build, docs: list[dict]):
+    """Builds one object per document; reports build time and the memory the objects add."""
+    gc.collect()
+    start = time.perf_counter()
+    objects = build(docs)
+    elapsed = time.perf_counter() - start
+    del objects
+
+    # Second pass for memory, since tracing slows the build down
+    gc.collect()
+    tracemalloc.start()
+    objects = build(docs)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rate = len(docs) / elapsed if elapsed else float("inf")
+    print(f"{label:<22} {elapsed:8.2f} s  {rate:12,.0f} rows/s  {size / 2**20:9.1f} MiB  ({size / len(docs):6.0f} B/row)")
+    del objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suggestion record benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} synthetic suggestion documents...")
+    docs = synthetic_docs(args.rows)
+    # Field values (strings, ObjectIds, datetimes) are shared with the source documents, so the
+    # numbers below are the container overhead each representation adds on top of them.
+    measure("dict copies", lambda rows: [dict(d) for d in rows], docs)
+    measure("SuggestionRecord", lambda rows: [SuggestionRecord.from_doc(d) for d in rows], docs)
+    measure("SongSuggestionInDB", lambda rows: [SongSuggestionInDB.model_validate(d) for d in rows], docs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# backend/benchmarks/bench_workers.py
+# Measures requests/second on /quota and /suggestions for increasing worker counts.
+# Requires a running MongoDB (MONGODB_URI) with seeded data.
+#
+#   cd backend && python -m benchmarks.bench_workers --duration 10 --concurrency 64
+#
+# The load generator is a single process; on large machines run it with fewer
+# --max-workers than cores so the client does not become the bottleneck.
+import argparse
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+ENDPOINTS = {
+    "quota": "/quota/user123",
+    "suggestions": "/suggestions/?instructor_id=instructor456",
+}
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready in time")
+
+
+async def run_load(base_url: str, path: str, duration: float, concurrency: int) -> float:
+    """Hammers one endpoint with `concurrency` clients and returns requests/second."""
+    completed = 0
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        async def worker():
+            nonlocal completed, errors
+            while time.monotonic() < deadline:
+                response = await client.get(path)
+                if response.status_code == 200:
+                    completed += 1
+                else:
+                    errors += 1
+
+        start = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - start
+
+    if errors:
+        print(f"    ({errors} non-200 responses)")
+    return completed / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker scaling benchmark")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-workers", type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    worker_counts = sorted({1, 2, 4, 8, 16, args.max_workers} & set(range(1, args.max_workers + 1)))
+    baseline: dict[str, float] = {}
+
+    for workers in worker_counts:
+        env = {**os.environ, "WEB_CONCURRENCY": str(workers), "BIND": f"127.0.0.1:{args.port}", "LOG_LEVEL": "warning"}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"],
+            env=env,
+        )
+        try:
+            asyncio.run(wait_until_ready(base_url))
+            for name, path in ENDPOINTS.items():
+                rps = asyncio.run(run_load(base_url, path, args.duration, args.concurrency))
+                baseline.setdefault(name, rps)
+                print(f"workers={workers:<3} {name:<12} {rps:10.1f} req/s  (x{rps / baseline[name]:.2f})")
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    main()
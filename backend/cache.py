@@ -0,0 +1,100 @@
+# backend/cache.py
+import time
+import logging
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# "memory" keeps a private cache in each worker process (safe, nothing is shared).
+# "redis" shares one cache between all workers; requires the optional `redis` package.
+CACHE_BACKEND = settings.cache_backend
+CACHE_URL = settings.cache_url
+
+
+# --- Backends ---
+# Values are always strings (callers JSON-encode) so every backend can store them as-is.
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """Per-process TTL cache. Each worker holds its own copy."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: dict[str, tuple[str, float]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._data.get(key)
+        if not entry:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        if ttl <= 0:
+            return
+        if len(self._data) >= self.max_entries and key not in self._data:
+            # Drop the oldest insertion; dicts keep insertion order.
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (value, time.monotonic() + ttl)
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by all workers through Redis."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # Optional dependency, only needed for this backend
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        if ttl <= 0:
+            return
+        await self._client.set(key, value, ex=ttl)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+# --- Cache Instance ---
+# Created lazily so the instance belongs to the worker process that uses it.
+_cache: CacheBackend | None = None
+
+def get_cache() -> CacheBackend:
+    """Returns the configured cache backend for this process."""
+    global _cache
+    if _cache is None:
+        if CACHE_BACKEND == "redis":
+            logger.info(f"Using shared Redis cache at {CACHE_URL}")
+            _cache = RedisCache(CACHE_URL)
+        else:
+            if CACHE_BACKEND != "memory":
+                logger.warning(f"Unknown CACHE_BACKEND '{CACHE_BACKEND}'. Falling back to in-memory cache.")
+            _cache = MemoryCache()
+    return _cache
+
+async def close_cache():
+    """Closes the cache backend (called from the app lifespan on shutdown)."""
+    global _cache
+    if _cache is not None:
+        await _cache.close()
+        _cache = None
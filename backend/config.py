@@ -0,0 +1,104 @@
+# backend/config.py
+import os
+import logging
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+# Load environment variables from .env file. This is the only place that does it.
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Application settings, read from the environment once at import time."""
+    # MongoDB
+    mongo_uri: str
+    db_name: str
+    mongo_max_pool_size: int
+    mongo_min_pool_size: int
+    mongo_server_selection_timeout_ms: int
+    mongo_connect_timeout_ms: int
+    mongo_socket_timeout_ms: int | None # None waits forever (driver default)
+    mongo_compressors: str # e.g. "zstd,snappy"; empty disables compression
+    # Read preference for read-heavy endpoints (listing suggestions, quota display).
+    # Writes and read-before-write checks always go to the primary.
+    mongo_read_preference: str
+    mongo_max_staleness_seconds: int # -1 means no limit
+    # Write-behind batching of suggestion inserts (see write_behind.py)
+    write_behind_enabled: bool
+    write_behind_batch_size: int # Flush once this many suggestions are queued...
+    write_behind_flush_ms: int # ...or this many milliseconds after the first one
+    write_behind_max_pending: int # Queue limit per worker; beyond it requests wait (backpressure)
+    write_behind_enqueue_timeout: float # Seconds a request waits for queue space before a 503
+    # Archival of resolved suggestions into monthly collections (see archive.py)
+    archive_after_days: int
+    archive_batch_size: int
+    # "Also suggested" co-occurrence recommendations (see recommendations.py)
+    recommendations_dir: str # Snapshot directory shared by all workers on the host
+    recommendations_rebuild_seconds: int # 0 disables the periodic rebuild
+    recommendations_neighbors: int # Neighbours kept per track in the snapshot
+    # Spotify
+    spotify_client_id: str | None
+    spotify_client_secret: str | None
+    spotify_search_cache_ttl: int # Seconds, 0 disables
+    # Cache backend for Spotify token/search results (see cache.py)
+    cache_backend: str
+    cache_url: str
+    # Web app
+    frontend_url: str | None
+    log_level: str
+    # Max seconds startup waits for the MongoDB check before serving anyway
+    startup_check_timeout: float
+
+
+def load_settings() -> Settings:
+    mongo_uri = os.getenv("MONGODB_URI")
+    if not mongo_uri:
+        logger.warning("MONGODB_URI environment variable not set. Using default 'mongodb://localhost:27017'")
+        mongo_uri = "mongodb://localhost:27017"
+
+    db_name = os.getenv("MONGODB_DB_NAME")
+    if not db_name:
+        logger.warning("MONGODB_DB_NAME environment variable not set. Using default 'barrys_suggestions_poc'")
+        db_name = "barrys_suggestions_poc"
+
+    return Settings(
+        mongo_uri=mongo_uri,
+        db_name=db_name,
+        mongo_max_pool_size=int(os.getenv("MONGODB_MAX_POOL_SIZE", "100")),
+        mongo_min_pool_size=int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+        mongo_server_selection_timeout_ms=int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        mongo_connect_timeout_ms=int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000")),
+        mongo_socket_timeout_ms=int(os.environ["MONGODB_SOCKET_TIMEOUT_MS"]) if os.getenv("MONGODB_SOCKET_TIMEOUT_MS") else None,
+        mongo_compressors=os.getenv("MONGODB_COMPRESSORS", ""),
+        mongo_read_preference=os.getenv("MONGODB_READ_PREFERENCE", "primary"),
+        mongo_max_staleness_seconds=int(os.getenv("MONGODB_MAX_STALENESS_SECONDS", "-1")),
+        write_behind_enabled=os.getenv("SUGGESTION_WRITE_BEHIND", "false").lower() in ("1", "true", "yes"),
+        write_behind_batch_size=int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500")),
+        write_behind_flush_ms=int(os.getenv("WRITE_BEHIND_FLUSH_MS", "5")),
+        write_behind_max_pending=int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000")),
+        write_behind_enqueue_timeout=float(os.getenv("WRITE_BEHIND_ENQUEUE_TIMEOUT", "1")),
+        archive_after_days=int(os.getenv("ARCHIVE_AFTER_DAYS", "90")),
+        archive_batch_size=int(os.getenv("ARCHIVE_BATCH_SIZE", "1000")),
+        recommendations_dir=os.getenv("RECOMMENDATIONS_DIR", "data/recommendations"),
+        recommendations_rebuild_seconds=int(os.getenv("RECOMMENDATIONS_REBUILD_SECONDS", "900")),
+        recommendations_neighbors=int(os.getenv("RECOMMENDATIONS_NEIGHBORS", "20")),
+        spotify_client_id=os.getenv("SPOTIFY_CLIENT_ID"),
+        spotify_client_secret=os.getenv("SPOTIFY_CLIENT_SECRET"),
+        spotify_search_cache_ttl=int(os.getenv("SPOTIFY_SEARCH_CACHE_TTL", "60")),
+        cache_backend=os.getenv("CACHE_BACKEND", "memory").lower(),
+        cache_url=os.getenv("CACHE_URL", "redis://localhost:6379/0"),
+        frontend_url=os.getenv("FRONTEND_URL"),
+        log_level=os.getenv("LOG_LEVEL", "info").upper(),
+        startup_check_timeout=float(os.getenv("STARTUP_CHECK_TIMEOUT", "5")),
+    )
+
+
+def configure_logging():
+    """Configures root logging. Called once by the app (or a script's __main__)."""
+    logging.basicConfig(level=settings.log_level)
+
+
+settings = load_settings()
@@ -1,45 +1,78 @@
 # backend/database.py
-import os
+import asyncio
 import logging
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
-from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession, AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
 
-# Load environment variables from .env file
-load_dotenv()
+from config import settings
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # --- Configuration ---
-MONGO_URI = os.getenv("MONGODB_URI")
-DB_NAME = os.getenv("MONGODB_DB_NAME")
+MONGO_URI = settings.mongo_uri
+DB_NAME = settings.db_name
 
-if not MONGO_URI:
-    logger.warning("MONGODB_URI environment variable not set. Using default 'mongodb://localhost:27017'")
-    MONGO_URI = "mongodb://localhost:27017"
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
 
-if not DB_NAME:
-    logger.warning("MONGODB_DB_NAME environment variable not set. Using default 'barrys_suggestions_poc'")
-    DB_NAME = "barrys_suggestions_poc"
+def client_options() -> dict:
+    """Keyword arguments for AsyncIOMotorClient built from settings (pool, timeouts, compression)."""
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "socketTimeoutMS": settings.mongo_socket_timeout_ms,
+    }
+    if settings.mongo_compressors:
+        # zstd needs the `zstandard` package and snappy needs `python-snappy`
+        options["compressors"] = settings.mongo_compressors
+    return options
+
+def read_preference():
+    """Read preference used for read-heavy endpoints (see MONGODB_READ_PREFERENCE)."""
+    name = settings.mongo_read_preference
+    if name not in READ_PREFERENCES:
+        logger.warning(f"Unknown MONGODB_READ_PREFERENCE '{name}'. Using 'primary'.")
+        return Primary()
+    if name == "primary":
+        return Primary() # Staleness limits don't apply to the primary
+    return READ_PREFERENCES[name](max_staleness=settings.mongo_max_staleness_seconds)
 
 # --- MongoDB Client Instance ---
 # Create the client instance once. Motor handles connection pooling.
 mongo_client: AsyncIOMotorClient | None = None
 
 # --- Connection Management Functions ---
-async def connect_to_mongo():
-    """Establishes the MongoDB connection."""
+async def connect_to_mongo(timeout: float | None = None):
+    """Creates the MongoDB client, checks the connection and returns the client.
+
+    Called from the app lifespan, so every worker process builds its own client after forking.
+    `timeout` bounds how long the initial check may hold up startup. Motor connects lazily, so
+    a failed or timed-out check (e.g. MongoDB still starting) keeps the client and later
+    operations connect once the server is up. Returns None only if the client can't be created
+    (e.g. an invalid URI).
+    """
     global mongo_client
     logger.info(f"Attempting to connect to MongoDB at {MONGO_URI}...")
     try:
-        mongo_client = AsyncIOMotorClient(MONGO_URI)
+        mongo_client = AsyncIOMotorClient(MONGO_URI, **client_options())
+    except Exception as e:
+        logger.error(f"Failed to create MongoDB client: {e!r}")
+        mongo_client = None
+        return None
+    try:
         # The ismaster command is cheap and does not require auth.
-        await mongo_client.admin.command('ismaster')
+        await asyncio.wait_for(mongo_client.admin.command('ismaster'), timeout)
         logger.info(f"Successfully connected to MongoDB. Using database: {DB_NAME}")
     except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {e}")
-        mongo_client = None # Ensure client is None if connection failed
+        logger.warning(f"MongoDB not reachable yet ({e!r}); operations will connect once it is up.")
+    return mongo_client
 
 # Updated function in database.py 
 async def close_mongo_connection(client=None):
@@ -70,6 +103,34 @@ def get_quotas_collection() -> AsyncIOMotorCollection:
     db = get_database()
     return db["quotas"]
 
+def get_versions_collection() -> AsyncIOMotorCollection:
+    """Returns the 'cache_versions' collection (ETag version counters, see versions.py)."""
+    db = get_database()
+    return db["cache_versions"]
+
+# Read-only handles. These may be routed to secondaries, so use them only where slightly
+# stale data is acceptable; anything that reads before writing should use the ones above.
+def get_suggestions_read_collection() -> AsyncIOMotorCollection:
+    """Returns the 'suggestions' collection using the configured read preference."""
+    return get_suggestions_collection().with_options(read_preference=read_preference())
+
+def get_quotas_read_collection() -> AsyncIOMotorCollection:
+    """Returns the 'quotas' collection using the configured read preference."""
+    return get_quotas_collection().with_options(read_preference=read_preference())
+
+def get_versions_read_collection() -> AsyncIOMotorCollection:
+    """Returns the 'cache_versions' collection using the configured read preference."""
+    return get_versions_collection().with_options(read_preference=read_preference())
+
+async def get_read_session() -> AsyncIOMotorClientSession:
+    """Yields a causally consistent session (FastAPI dependency).
+
+    Reads made in it after reading a version counter see data at least as new as that counter,
+    even when the two reads are routed to different (or lagging) secondaries.
+    """
+    async with await get_database().client.start_session(causal_consistency=True) as session:
+        yield session
+
 # --- Example Usage (for testing module directly) ---
 async def _test_connection():
     await connect_to_mongo()
@@ -92,5 +153,6 @@ async def _test_connection():
         logger.error("Cannot run test, MongoDB connection failed.")
 
 if __name__ == "__main__":
-    import asyncio
+    from config import configure_logging
+    configure_logging()
     asyncio.run(_test_connection())
\ No newline at end of file
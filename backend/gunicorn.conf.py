@@ -0,0 +1,28 @@
+# backend/gunicorn.conf.py
+# Production server settings: `gunicorn -c gunicorn.conf.py app:app`
+# Each worker is a separate uvicorn process with its own event loop, MongoDB client
+# (created in the app lifespan) and cache instance (see cache.py).
+import os
+import multiprocessing
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Defaults to one worker per core; the app is async so extra workers mostly add memory.
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Do not import the app in the master process: Motor clients must be created after fork.
+preload_app = False
+
+# Graceful shutdown: on SIGTERM workers stop accepting connections, finish in-flight
+# requests and run the lifespan shutdown (closing MongoDB) within this many seconds.
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Recycle workers periodically to bound memory growth; jitter avoids restarting all at once.
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = os.getenv("ACCESS_LOG", None)
+loglevel = os.getenv("LOG_LEVEL", "info")
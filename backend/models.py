@@ -1,36 +1,40 @@
 # backend/models.py
-from pydantic import BaseModel, Field, validator
-from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, PlainSerializer, PlainValidator, ValidationInfo, WithJsonSchema, field_validator
+from typing import Annotated, Literal, Optional
 from datetime import datetime
 from bson import ObjectId # Import ObjectId from bson library (installed with motor)
 
 # --- Helper for MongoDB ObjectId ---
-# Pydantic doesn't natively handle MongoDB's ObjectId, so we add a validator/serializer.
-class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
+# Pydantic doesn't natively handle MongoDB's ObjectId, so we annotate it with a validator,
+# a JSON serializer and a JSON schema. model_dump() keeps the ObjectId (for MongoDB);
+# model_dump_json() and API responses emit it as a string.
+def validate_object_id(v) -> ObjectId:
+    if isinstance(v, ObjectId):
+        return v
+    if not ObjectId.is_valid(v):
+        raise ValueError("Invalid ObjectId")
+    return ObjectId(v)
 
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return ObjectId(v)
+def serialize_object_id(v: ObjectId) -> str:
+    return str(v)
 
-    @classmethod
-    def __modify_schema__(cls, field_schema):
-        field_schema.update(type="string")
+PyObjectId = Annotated[
+    ObjectId,
+    PlainValidator(validate_object_id),
+    PlainSerializer(serialize_object_id, return_type=str, when_used="json"),
+    WithJsonSchema({"type": "string"}),
+]
 
 
 # --- Song Suggestion Models ---
 
 # Base model with common fields
 class SongSuggestionBase(BaseModel):
-    spotify_uri: str = Field(..., example="spotify:track:0VjIjW4GlUZAMYd2vXMi3b")
-    song_name: str = Field(..., example="Blinding Lights")
-    artist_name: str = Field(..., example="The Weeknd")
-    album_cover_url: Optional[str] = Field(None, example="https://i.scdn.co/image/ab67616d0000b2738863bc11d2aa12b54f5aeb36")
-    class_id: str = Field(..., example="class_123abc") # ID from Barry's system
+    spotify_uri: str = Field(..., examples=["spotify:track:0VjIjW4GlUZAMYd2vXMi3b"])
+    song_name: str = Field(..., examples=["Blinding Lights"])
+    artist_name: str = Field(..., examples=["The Weeknd"])
+    album_cover_url: Optional[str] = Field(None, examples=["https://i.scdn.co/image/ab67616d0000b2738863bc11d2aa12b54f5aeb36"])
+    class_id: str = Field(..., examples=["class_123abc"]) # ID from Barry's system
 
 # Model for creating a suggestion (input to API)
 class SongSuggestionCreate(SongSuggestionBase):
@@ -39,16 +43,25 @@ class SongSuggestionCreate(SongSuggestionBase):
 
 # Model representing the data structure in MongoDB
 class SongSuggestionInDB(SongSuggestionBase):
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id") # Maps MongoDB _id to id
-    participant_id: str = Field(..., example="user_789xyz") # Added when saving
-    instructor_id: str = Field(..., example="instructor_456def") # Added when saving (from class lookup?)
+    model_config = ConfigDict(populate_by_name=True) # Allows using 'id' as well as '_id' when creating instance
+
+    id: PyObjectId = Field(default_factory=ObjectId, alias="_id") # Maps MongoDB _id to id
+    participant_id: str = Field(..., examples=["user_789xyz"]) # Added when saving
+    instructor_id: str = Field(..., examples=["instructor_456def"]) # Added when saving (from class lookup?)
     suggestion_date: datetime = Field(default_factory=datetime.utcnow)
     status: Literal['pending', 'approved', 'rejected'] = 'pending'
 
-    class Config:
-        allow_population_by_field_name = True # Allows using '_id' when creating instance
-        arbitrary_types_allowed = True # Necessary for PyObjectId
-        json_encoders = {ObjectId: str} # Serialize ObjectId to string in JSON responses
+
+# Model for a suggestion in the ranked review queue (one per track, newest suggestion shown)
+class RankedSuggestion(SongSuggestionInDB):
+    votes: int = Field(..., examples=[3]) # Pending suggestions for the same track in the class
+    score: float = Field(..., examples=[1.84])
+
+
+# Model for an "also suggested" recommendation
+class SimilarTrack(BaseModel):
+    spotify_uri: str = Field(..., examples=["spotify:track:6UelLqGlWMcVH1E5c4H7lY"])
+    score: float = Field(..., examples=[4.0]) # Number of classes where both tracks were suggested
 
 
 # Model for updating the status
@@ -60,14 +73,15 @@ class SongSuggestionUpdateStatus(BaseModel):
 
 # Base model for quota info
 class QuotaRecordBase(BaseModel):
-    user_id: str = Field(..., example="user_789xyz")
-    month_year: str = Field(..., example="2025-03") # Format YYYY-MM
-    total_quota: int = Field(..., ge=0, example=5) # Must be >= 0
-    remaining_quota: int = Field(..., ge=0, example=3) # Must be >= 0
-
-    @validator('remaining_quota')
-    def remaining_must_be_less_than_or_equal_to_total(cls, v, values):
-        if 'total_quota' in values and v > values['total_quota']:
+    user_id: str = Field(..., examples=["user_789xyz"])
+    month_year: str = Field(..., examples=["2025-03"]) # Format YYYY-MM
+    total_quota: int = Field(..., ge=0, examples=[5]) # Must be >= 0
+    remaining_quota: int = Field(..., ge=0, examples=[3]) # Must be >= 0
+
+    @field_validator('remaining_quota')
+    @classmethod
+    def remaining_must_be_less_than_or_equal_to_total(cls, v: int, info: ValidationInfo) -> int:
+        if 'total_quota' in info.data and v > info.data['total_quota']:
             raise ValueError('remaining_quota cannot be greater than total_quota')
         return v
 
@@ -77,9 +91,6 @@ class QuotaRecordCreate(QuotaRecordBase):
 
 # Model representing the data structure in MongoDB
 class QuotaRecordInDB(QuotaRecordBase):
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    model_config = ConfigDict(populate_by_name=True)
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    id: PyObjectId = Field(default_factory=ObjectId, alias="_id")
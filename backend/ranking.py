@@ -0,0 +1,178 @@
+# backend/ranking.py
+# Scores a class's pending suggestions for the instructor review queue.
+# Suggestions are grouped by track; each track is scored from
+#   - votes: how many pending suggestions name the track
+#   - recency: exponential decay on the age of its newest suggestion
+#   - participant history: approval rate of the participants who suggested it
+#   - artist diversity: tracks from an artist with many candidates are damped
+# MongoDB groups the candidates by track; scoring runs on NumPy arrays over all tracks at once.
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain, repeat
+from operator import itemgetter
+from typing import Optional
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import DESCENDING
+
+logger = logging.getLogger(__name__)
+
+# --- Scoring Weights ---
+VOTE_WEIGHT = 1.0
+RECENCY_WEIGHT = 0.5
+HISTORY_WEIGHT = 0.5
+RECENCY_HALF_LIFE_HOURS = 24.0
+
+MAX_CANDIDATES = 200_000
+EPOCH = datetime(1970, 1, 1) # Stored dates are naive UTC
+
+
+async def ensure_ranking_indexes(suggestions_coll: AsyncIOMotorCollection):
+    """Indexes behind ranking_pipeline ($match + $sort) and participant_approval_rates."""
+    await suggestions_coll.create_index([("class_id", 1), ("status", 1), ("suggestion_date", DESCENDING)])
+    await suggestions_coll.create_index([("participant_id", 1), ("status", 1)])
+
+
+def ranking_pipeline(class_id: str) -> list[dict]:
+    """Groups a class's pending suggestions by track on the server: one row per track.
+
+    Each row carries the track's newest suggestion (_id, date as epoch milliseconds, artist)
+    and the participants who suggested it, newest first.
+    """
+    return [
+        {"$match": {"class_id": class_id, "status": "pending"}},
+        {"$sort": {"suggestion_date": -1}},
+        {"$limit": MAX_CANDIDATES},
+        {"$group": {
+            "_id": "$spotify_uri",
+            "suggestion_id": {"$first": "$_id"},
+            "newest": {"$first": {"$toLong": "$suggestion_date"}},
+            "artist_name": {"$first": {"$ifNull": ["$artist_name", ""]}},
+            "participants": {"$push": {"$ifNull": ["$participant_id", ""]}},
+        }},
+    ]
+
+
+@dataclass
+class RankingColumns:
+    """Candidate tracks as parallel arrays (one entry per track).
+
+    Built from the grouped rows with map/itemgetter and NumPy; there is no per-suggestion
+    Python loop. The suggesters of every track are kept in one flat list, track i's being
+    participant_ids[offsets[i]:offsets[i + 1]].
+    """
+    suggestion_ids: list # _id of each track's newest suggestion
+    spotify_uris: list[str]
+    artist_codes: np.ndarray # int, artists grouped by code
+    votes: np.ndarray # int, pending suggestions of the track
+    newest_times: np.ndarray # float, seconds since the Unix epoch (UTC) of the newest suggestion
+    participant_ids: list[str]
+    offsets: np.ndarray # int, len(tracks) + 1
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> "RankingColumns":
+        suggesters = list(map(itemgetter("participants"), rows))
+        votes = np.fromiter(map(len, suggesters), dtype=np.int64, count=len(rows))
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(votes, out=offsets[1:])
+        artist_names = list(map(itemgetter("artist_name"), rows))
+        _, artist_codes = np.unique(np.array(artist_names, dtype=str), return_inverse=True)
+        return cls(
+            suggestion_ids=list(map(itemgetter("suggestion_id"), rows)),
+            spotify_uris=list(map(itemgetter("_id"), rows)),
+            artist_codes=artist_codes.astype(np.int64),
+            votes=votes,
+            newest_times=np.fromiter(map(itemgetter("newest"), rows), dtype=np.float64, count=len(rows)) / 1000.0,
+            participant_ids=list(chain.from_iterable(suggesters)),
+            offsets=offsets,
+        )
+
+    def __len__(self) -> int:
+        return len(self.spotify_uris)
+
+
+@dataclass
+class RankedTrack:
+    suggestion_id: object # _id of the track's newest suggestion
+    spotify_uri: str
+    votes: int
+    score: float
+
+
+def rank_candidates(
+    columns: RankingColumns,
+    approval_rates: dict[str, float],
+    k: int,
+    now: Optional[datetime] = None,
+) -> list[RankedTrack]:
+    """Scores candidate tracks and returns the top `k`, best first."""
+    if len(columns) == 0 or k <= 0:
+        return []
+    now_seconds = ((now or datetime.utcnow()) - EPOCH).total_seconds()
+    age_hours = (now_seconds - columns.newest_times) / 3600.0
+    np.maximum(age_hours, 0.0, out=age_hours)
+
+    votes = columns.votes
+    recency = np.exp2(-age_hours / RECENCY_HALF_LIFE_HOURS)
+
+    # Mean approval rate of each track's suggesters; unknown participants count as neutral (0.5)
+    suggester_rates = np.fromiter(
+        map(approval_rates.get, columns.participant_ids, repeat(0.5)),
+        dtype=np.float64, count=len(columns.participant_ids)
+    )
+    history = np.add.reduceat(suggester_rates, columns.offsets[:-1]) / votes
+
+    # Damp artists that dominate the candidate list
+    diversity = 1.0 / np.sqrt(np.bincount(columns.artist_codes)[columns.artist_codes])
+
+    scores = (VOTE_WEIGHT * np.log1p(votes) + RECENCY_WEIGHT * recency + HISTORY_WEIGHT * history) * diversity
+
+    # Partial selection of the top k (O(n)), then order just those k
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [
+        RankedTrack(
+            suggestion_id=columns.suggestion_ids[t],
+            spotify_uri=columns.spotify_uris[t],
+            votes=int(votes[t]),
+            score=float(scores[t]),
+        )
+        for t in top
+    ]
+
+
+async def participant_approval_rates(suggestions_coll: AsyncIOMotorCollection, participant_ids: list[str]) -> dict[str, float]:
+    """Smoothed share of each participant's resolved suggestions that were approved."""
+    pipeline = [
+        {"$match": {"participant_id": {"$in": participant_ids}, "status": {"$in": ["approved", "rejected"]}}},
+        {"$group": {
+            "_id": "$participant_id",
+            "approved": {"$sum": {"$cond": [{"$eq": ["$status", "approved"]}, 1, 0]}},
+            "total": {"$sum": 1},
+        }},
+    ]
+    rates = {}
+    async for row in suggestions_coll.aggregate(pipeline):
+        # Laplace smoothing keeps one lucky approval from dominating
+        rates[row["_id"]] = (row["approved"] + 1) / (row["total"] + 2)
+    return rates
+
+
+async def rank_class_suggestions(suggestions_coll: AsyncIOMotorCollection, class_id: str, k: int) -> list[tuple[RankedTrack, dict]]:
+    """Ranks the pending suggestions of a class; returns the top `k` with their full documents."""
+    rows = await suggestions_coll.aggregate(ranking_pipeline(class_id), allowDiskUse=True).to_list(length=None)
+    if not rows:
+        return []
+    columns = RankingColumns.from_rows(rows)
+    rates = await participant_approval_rates(suggestions_coll, list(set(columns.participant_ids)))
+    ranked = rank_candidates(columns, rates, k)
+    logger.info(f"Ranked {len(columns.participant_ids)} pending suggestions ({len(columns)} tracks) for class {class_id}; returning top {len(ranked)}.")
+
+    docs = {
+        doc["_id"]: doc
+        async for doc in suggestions_coll.find({"_id": {"$in": [r.suggestion_id for r in ranked]}})
+    }
+    return [(r, docs[r.suggestion_id]) for r in ranked if r.suggestion_id in docs]
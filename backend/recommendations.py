@@ -0,0 +1,276 @@
+# backend/recommendations.py
+# "Others in this class also suggested" recommendations.
+#
+# Two tracks co-occur when both were suggested for the same class; the score of a pair is the
+# number of classes they share. The co-occurrence matrix is rebuilt periodically from the
+# `suggestions` collection and stored as CSR arrays (indptr/indices/data) keeping only the top
+# neighbours of each track. Snapshots are written as .npy files and memory-mapped, so every
+# worker on a host shares one copy through the page cache. New suggestions are folded in
+# incrementally (per worker) until the next rebuild.
+import asyncio
+import heapq
+import logging
+import os
+import shutil
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_BASKET = 200 # Tracks per class considered when counting pairs
+STALE_LOCK_SECONDS = 600
+SNAPSHOTS_TO_KEEP = 2
+ARRAYS = ("track_uris", "indptr", "indices", "data", "class_ids", "basket_indptr", "basket_tracks")
+
+
+def encode_keys(keys) -> np.ndarray:
+    """UTF-8 encodes URIs/class ids into a fixed-width bytes array (NumPy would ASCII-encode str)."""
+    encoded = [key.encode() for key in keys]
+    return np.array(encoded, dtype=bytes) if encoded else np.array([], dtype="S1")
+
+def _row_of(keys: np.ndarray, key: str) -> int:
+    encoded = key.encode()
+    i = int(np.searchsorted(keys, encoded))
+    if i < len(keys) and keys[i] == encoded:
+        return i
+    return -1
+
+
+@dataclass
+class CooccurrenceSnapshot:
+    track_uris: np.ndarray # Sorted UTF-8 bytes, row i belongs to track_uris[i]
+    indptr: np.ndarray # int64, row i's neighbours are indices/data[indptr[i]:indptr[i + 1]]
+    indices: np.ndarray # int32, neighbour rows, best first
+    data: np.ndarray # float32, co-occurrence counts
+    class_ids: np.ndarray # Sorted UTF-8 bytes, the classes the counts were built from
+    basket_indptr: np.ndarray # int64, class i's tracks are basket_tracks[basket_indptr[i]:basket_indptr[i + 1]]
+    basket_tracks: np.ndarray # int32, rows of track_uris
+    version: str = ""
+
+    def row_of(self, spotify_uri: str) -> int:
+        return _row_of(self.track_uris, spotify_uri)
+
+    def neighbours(self, spotify_uri: str) -> list[tuple[str, float]]:
+        i = self.row_of(spotify_uri)
+        if i < 0:
+            return []
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return [
+            (self.track_uris[j].decode(), float(score))
+            for j, score in zip(self.indices[start:end], self.data[start:end])
+        ]
+
+    def basket(self, class_id: str) -> list[str]:
+        """Tracks of the class that the counts already include."""
+        i = _row_of(self.class_ids, class_id)
+        if i < 0:
+            return []
+        return [self.track_uris[j].decode() for j in self.basket_tracks[self.basket_indptr[i]:self.basket_indptr[i + 1]]]
+
+
+def build_snapshot(baskets: dict[str, list[str]], neighbours: int) -> CooccurrenceSnapshot:
+    """Builds the top-`neighbours` co-occurrence CSR arrays from each class's distinct tracks."""
+    baskets = {class_id: uris[:MAX_BASKET] for class_id, uris in baskets.items()}
+    track_uris = np.unique(encode_keys({uri for uris in baskets.values() for uri in uris}))
+    n = len(track_uris)
+
+    # Each class's tracks as rows of track_uris, classes in sorted order
+    class_ids = encode_keys(sorted(baskets, key=str.encode))
+    basket_codes = [np.searchsorted(track_uris, encode_keys(baskets[c.decode()])).astype(np.int32) for c in class_ids]
+    basket_indptr = np.zeros(len(class_ids) + 1, dtype=np.int64)
+    np.cumsum([len(codes) for codes in basket_codes], out=basket_indptr[1:])
+    basket_tracks = np.concatenate(basket_codes) if basket_codes else np.array([], dtype=np.int32)
+
+    # Every ordered pair of distinct tracks in a basket, encoded as row * n + col
+    pair_keys = []
+    for codes in basket_codes:
+        if len(codes) < 2:
+            continue
+        codes = codes.astype(np.int64)
+        rows = np.repeat(codes, len(codes))
+        cols = np.tile(codes, len(codes))
+        distinct = rows != cols
+        pair_keys.append(rows[distinct] * n + cols[distinct])
+
+    if not pair_keys:
+        return CooccurrenceSnapshot(
+            track_uris, np.zeros(n + 1, dtype=np.int64), np.array([], dtype=np.int32), np.array([], dtype=np.float32),
+            class_ids, basket_indptr, basket_tracks
+        )
+
+    keys, counts = np.unique(np.concatenate(pair_keys), return_counts=True)
+    rows, cols = keys // n, keys % n
+
+    # Keep the `neighbours` best columns of each row, best first
+    order = np.lexsort((-counts, rows))
+    rows, cols, counts = rows[order], cols[order], counts[order]
+    row_start = np.searchsorted(rows, rows, side="left")
+    keep = (np.arange(len(rows)) - row_start) < neighbours
+    rows, cols, counts = rows[keep], cols[keep], counts[keep]
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return CooccurrenceSnapshot(
+        track_uris, indptr, cols.astype(np.int32), counts.astype(np.float32),
+        class_ids, basket_indptr, basket_tracks
+    )
+
+
+class CooccurrenceRecommender:
+    """Serves co-occurrence lookups from a memory-mapped snapshot plus a per-worker delta."""
+
+    def __init__(self, snapshot_dir: str, neighbours: int):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.neighbours = neighbours
+        self._snapshot: Optional[CooccurrenceSnapshot] = None
+        # Incremental path: each touched class's tracks (the snapshot's plus any seen since),
+        # and the pairs from suggestions this worker saw since the snapshot was loaded
+        self._tracks_by_class: dict[str, set[str]] = {}
+        self._delta: dict[str, Counter] = {}
+
+    # --- Lookups ---
+    def similar(self, spotify_uri: str, limit: int = 10) -> list[tuple[str, float]]:
+        """Tracks most often suggested alongside `spotify_uri`, best first."""
+        scores = dict(self._snapshot.neighbours(spotify_uri)) if self._snapshot else {}
+        for other, count in self._delta.get(spotify_uri, {}).items():
+            scores[other] = scores.get(other, 0.0) + count
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def record_suggestion(self, class_id: str, spotify_uri: str):
+        """Counts the pairs a new suggestion adds: only when the track is new to its class."""
+        tracks = self._tracks_by_class.get(class_id)
+        if tracks is None:
+            tracks = self._tracks_by_class[class_id] = set(self._snapshot.basket(class_id)) if self._snapshot else set()
+        if spotify_uri in tracks or len(tracks) >= MAX_BASKET:
+            return
+        for other in tracks:
+            self._delta.setdefault(spotify_uri, Counter())[other] += 1
+            self._delta.setdefault(other, Counter())[spotify_uri] += 1
+        tracks.add(spotify_uri)
+
+    # --- Snapshots ---
+    def _current_file(self) -> Path:
+        return self.snapshot_dir / "CURRENT"
+
+    def snapshot_age(self) -> float:
+        """Seconds since the latest snapshot was published (infinite if there is none or it is incomplete)."""
+        try:
+            version_dir = self.snapshot_dir / self._current_file().read_text().strip()
+            if not all((version_dir / f"{name}.npy").exists() for name in ARRAYS):
+                return float("inf") # Written by an older format; rebuild it
+            return time.time() - self._current_file().stat().st_mtime
+        except FileNotFoundError:
+            return float("inf")
+
+    def reload(self) -> bool:
+        """Memory-maps the latest published snapshot if it is newer than the loaded one."""
+        try:
+            version = self._current_file().read_text().strip()
+        except FileNotFoundError:
+            return False
+        if self._snapshot and self._snapshot.version == version:
+            return False
+        version_dir = self.snapshot_dir / version
+        arrays = {name: np.load(version_dir / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+        self._snapshot = CooccurrenceSnapshot(**arrays, version=version)
+        # The new snapshot already counts everything the delta was covering
+        self._tracks_by_class.clear()
+        self._delta.clear()
+        logger.info(f"Loaded recommendations snapshot {version} ({len(self._snapshot.track_uris)} tracks).")
+        return True
+
+    def publish(self, snapshot: CooccurrenceSnapshot) -> str:
+        """Writes a snapshot to a new version directory and atomically points CURRENT at it."""
+        version = f"v{int(time.time() * 1000)}-{os.getpid()}"
+        version_dir = self.snapshot_dir / version
+        version_dir.mkdir(parents=True)
+        for name in ARRAYS:
+            np.save(version_dir / f"{name}.npy", getattr(snapshot, name))
+        pointer = self.snapshot_dir / f"CURRENT.{os.getpid()}.tmp"
+        pointer.write_text(version)
+        os.replace(pointer, self._current_file())
+
+        # Old versions can go; workers still mapping them keep their (unlinked) pages
+        old_versions = sorted(p for p in self.snapshot_dir.glob("v*") if p.is_dir() and p.name != version)
+        for old in old_versions[:max(len(old_versions) - (SNAPSHOTS_TO_KEEP - 1), 0)]:
+            shutil.rmtree(old, ignore_errors=True)
+        return version
+
+    async def rebuild(self, suggestions_coll: AsyncIOMotorCollection) -> str:
+        """Recomputes the matrix from the suggestions collection and publishes it."""
+        pipeline = [{"$group": {"_id": "$class_id", "uris": {"$addToSet": "$spotify_uri"}}}]
+        baskets = {str(row["_id"]): row["uris"] async for row in suggestions_coll.aggregate(pipeline, allowDiskUse=True)}
+        # The NumPy work runs off the event loop
+        snapshot = await asyncio.to_thread(build_snapshot, baskets, self.neighbours)
+        version = self.publish(snapshot)
+        logger.info(f"Published recommendations snapshot {version} from {len(baskets)} classes.")
+        return version
+
+    # --- Periodic Rebuild ---
+    def _acquire_build_lock(self) -> bool:
+        """Lets only one worker on the host rebuild at a time."""
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        lock = self.snapshot_dir / "build.lock"
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            if time.time() - lock.stat().st_mtime > STALE_LOCK_SECONDS:
+                lock.unlink(missing_ok=True) # Left behind by a crashed worker
+            return False
+
+    def _release_build_lock(self):
+        (self.snapshot_dir / "build.lock").unlink(missing_ok=True)
+
+    async def run_periodic(self, suggestions_coll: AsyncIOMotorCollection, interval: int):
+        """Rebuilds when the snapshot is older than `interval` and picks up snapshots from other workers."""
+        while True:
+            try:
+                if self.snapshot_age() >= interval and self._acquire_build_lock():
+                    try:
+                        await self.rebuild(suggestions_coll)
+                    finally:
+                        self._release_build_lock()
+                self.reload()
+            except Exception as e:
+                logger.error(f"Recommendations refresh failed: {e}")
+            await asyncio.sleep(min(interval, 60))
+
+
+# --- Recommender Instance ---
+# One per worker process; the snapshot files behind it are shared.
+recommender = CooccurrenceRecommender(settings.recommendations_dir, settings.recommendations_neighbors)
+_refresh_task: asyncio.Task | None = None
+
+def record_suggestions(suggestion_docs: Iterable[dict]):
+    """Counts stored suggestions into this worker's delta. Failures are logged, never raised."""
+    try:
+        for doc in suggestion_docs:
+            recommender.record_suggestion(doc["class_id"], doc["spotify_uri"])
+    except Exception as e:
+        logger.error(f"Failed to record suggestions for recommendations: {e}")
+
+def start_recommendations_refresh(suggestions_coll: AsyncIOMotorCollection):
+    global _refresh_task
+    try:
+        recommender.reload()
+    except Exception as e:
+        logger.error(f"Could not load recommendations snapshot: {e}")
+    if settings.recommendations_rebuild_seconds > 0:
+        _refresh_task = asyncio.create_task(
+            recommender.run_periodic(suggestions_coll, settings.recommendations_rebuild_seconds)
+        )
+
+def stop_recommendations_refresh():
+    global _refresh_task
+    if _refresh_task:
+        _refresh_task.cancel()
+        _refresh_task = None
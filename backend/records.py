@@ -0,0 +1,55 @@
+# backend/records.py
+# Compact in-process representation of a suggestion that is held for a while (the
+# write-behind queue). A slotted dataclass has no per-instance __dict__ and skips
+# validation, so it is much smaller and faster to build than SongSuggestionInDB.
+# Rows that only pass through a request (listings, ranking results) stay MongoDB documents
+# and are validated straight into the response model.
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+
+
+@dataclass(slots=True)
+class SuggestionRecord:
+    id: ObjectId
+    spotify_uri: str
+    song_name: str
+    artist_name: str
+    album_cover_url: Optional[str]
+    class_id: str
+    participant_id: str
+    instructor_id: str
+    suggestion_date: datetime
+    status: str
+
+    @classmethod
+    def from_doc(cls, doc: dict) -> "SuggestionRecord":
+        """Builds a record from a MongoDB suggestion document."""
+        return cls(
+            doc["_id"],
+            doc["spotify_uri"],
+            doc["song_name"],
+            doc["artist_name"],
+            doc.get("album_cover_url"),
+            doc["class_id"],
+            doc["participant_id"],
+            doc["instructor_id"],
+            doc["suggestion_date"],
+            doc["status"],
+        )
+
+    def to_doc(self) -> dict:
+        """MongoDB document for this record (`_id` key)."""
+        return {
+            "_id": self.id,
+            "spotify_uri": self.spotify_uri,
+            "song_name": self.song_name,
+            "artist_name": self.artist_name,
+            "album_cover_url": self.album_cover_url,
+            "class_id": self.class_id,
+            "participant_id": self.participant_id,
+            "instructor_id": self.instructor_id,
+            "suggestion_date": self.suggestion_date,
+            "status": self.status,
+        }
@@ -1,11 +1,12 @@
 # backend/routers/quotas.py
 import logging
-from fastapi import APIRouter, HTTPException, Depends, Path
+from fastapi import APIRouter, HTTPException, Depends, Path, Request, Response
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorCollection
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
 
 # Use direct imports from sibling modules/files
-from database import get_quotas_collection
+from database import get_quotas_read_collection, get_versions_read_collection, get_read_session
+from versions import CACHE_CONTROL, make_etag, etag_matches, quota_key
 from models import QuotaRecordInDB
 
 router = APIRouter()
@@ -14,6 +15,10 @@ logger = logging.getLogger(__name__)
 # Define the mock user ID used in the frontend App.tsx
 MOCK_USER_ID_FOR_POC = "user123"
 
+def quota_response(quota: QuotaRecordInDB, headers: dict) -> Response:
+    """Serializes the record with pydantic-core directly; response_model only documents the route."""
+    return Response(content=quota.model_dump_json(by_alias=True), media_type="application/json", headers=headers)
+
 @router.get(
     "/{user_id}",
     response_model=QuotaRecordInDB,
@@ -21,19 +26,29 @@ MOCK_USER_ID_FOR_POC = "user123"
     description="Retrieves the quota record for the specified user for the current month."
 )
 async def get_user_quota(
+    request: Request,
     user_id: str = Path(..., description="The ID of the user to retrieve quota for"),
-    quotas_coll: AsyncIOMotorCollection = Depends(get_quotas_collection)
-) -> QuotaRecordInDB:
+    quotas_coll: AsyncIOMotorCollection = Depends(get_quotas_read_collection),
+    versions_coll: AsyncIOMotorCollection = Depends(get_versions_read_collection),
+    session: AsyncIOMotorClientSession = Depends(get_read_session)
+) -> Response:
+    # --- Conditional GET: the month is part of the ETag so a new month always refetches ---
+    # Counter and record are read in one causally consistent session (see versions.make_etag)
+    etag = await make_etag(versions_coll, quota_key(user_id), user_id, datetime.utcnow().strftime("%Y-%m"), session=session)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
     # For PoC, we primarily care about the hardcoded mock user
     if user_id != MOCK_USER_ID_FOR_POC:
          logger.warning(f"Quota requested for non-mock user: {user_id}. Returning default empty quota.")
          # Return a default record for non-mock users in this PoC phase
-         return QuotaRecordInDB(
+         return quota_response(QuotaRecordInDB(
              user_id=user_id,
              month_year=datetime.utcnow().strftime("%Y-%m"),
              total_quota=0,
              remaining_quota=0
-         )
+         ), headers)
 
     logger.info(f"Fetching quota for user: {user_id}")
     current_month_year = datetime.utcnow().strftime("%Y-%m")
@@ -41,19 +56,19 @@ async def get_user_quota(
     quota_record_dict = await quotas_coll.find_one({
         "user_id": user_id,
         "month_year": current_month_year
-    })
+    }, session=session)
 
     if quota_record_dict:
         logger.info(f"Found quota record for {user_id}: {quota_record_dict}")
-        # Pydantic automatically handles the _id mapping here if allow_population_by_field_name=True
-        return QuotaRecordInDB(**quota_record_dict)
+        # The _id key maps to the id field (alias="_id")
+        return quota_response(QuotaRecordInDB.model_validate(quota_record_dict), headers)
     else:
         # If no record found for the mock user, return a default (or potentially create one - returning default for now)
         logger.warning(f"No quota record found for mock user {user_id} for month {current_month_year}. Returning default empty quota. Consider seeding data.")
         # You might want to seed data instead of returning this default in a real scenario
-        return QuotaRecordInDB(
+        return quota_response(QuotaRecordInDB(
             user_id=user_id,
             month_year=current_month_year,
             total_quota=0, # Default values if not found
             remaining_quota=0
-        )
+        ), headers)
@@ -1,13 +1,14 @@
 # backend/routers/spotify_search.py
 import logging
 from fastapi import APIRouter, HTTPException, Query, Depends
-# Use relative import to access the spotify module functions
-# from .. import spotify # <<< PROBLEM LINE
-from spotify import search_spotify # <<< CORRECTED IMPORT
+# The spotify module (and httpx) and recommendations (NumPy) are imported on first search,
+# not at app startup
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+ALSO_SUGGESTED_LIMIT = 5 # "Also suggested" tracks attached to each search result
+
 @router.get("/search")
 async def search_tracks(
     q: str = Query(..., min_length=1, description="The search query string.")
@@ -18,8 +19,10 @@ async def search_tracks(
     """
     logger.info(f"Received Spotify search request for query: '{q}'")
 
+    from spotify import search_spotify
+    from recommendations import recommender
+
     try:
-        # Call the search function using the direct import
         # search_spotify function handles getting the token
         search_results = await search_spotify(query=q, limit=10) # Use imported function directly
 
@@ -30,7 +33,13 @@ async def search_tracks(
                 detail="Could not connect to Spotify or search failed. Please try again later."
             )
 
-        track_count = len(search_results.get('tracks', {}).get('items', []))
+        tracks = search_results.get('tracks', {}).get('items', [])
+        # "Others also suggested" for each result; lookups hit the in-memory snapshot only
+        for track in tracks:
+            if track and track.get('uri'):
+                track['also_suggested'] = [uri for uri, _ in recommender.similar(track['uri'], ALSO_SUGGESTED_LIMIT)]
+
+        track_count = len(tracks)
         logger.info(f"Successfully fetched {track_count} tracks from Spotify for query: '{q}'")
 
         return search_results
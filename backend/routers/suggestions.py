@@ -1,18 +1,34 @@
 # backend/routers/suggestions.py
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Body, Query, Path
+from fastapi import APIRouter, HTTPException, Depends, Body, Query, Path, Request, Response
+from pydantic import TypeAdapter
 from datetime import datetime
 from bson import ObjectId # For checking valid ID format and converting string path param
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument
 
 # Use direct imports from sibling modules/files
-from database import get_suggestions_collection, get_quotas_collection
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from database import (
+    get_suggestions_collection,
+    get_suggestions_read_collection,
+    get_quotas_collection,
+    get_versions_collection,
+    get_versions_read_collection,
+    get_read_session,
+)
+from write_behind import SuggestionWriteBehind, get_suggestion_writer
+from archive import find_suggestions_in_range
+# ranking and recommendations (NumPy) are imported in the handlers that use them, not at startup
+from records import SuggestionRecord
+from versions import CACHE_CONTROL, bump_quota, bump_suggestions, suggestions_key, make_etag, etag_matches
 from models import (
     SongSuggestionCreate,
     SongSuggestionInDB,
     SongSuggestionUpdateStatus,
-    PyObjectId # Import the helper
+    RankedSuggestion,
+    SimilarTrack
 )
 
 router = APIRouter()
@@ -23,6 +39,15 @@ MOCK_PARTICIPANT_ID = "user123"
 MOCK_INSTRUCTOR_ID = "instructor456" # Assuming this is constant for PoC class association
 MOCK_CLASS_ID_FOR_DEMO = "class789" # Assuming suggestions are for this class in PoC
 
+# Responses are validated and serialized to JSON by pydantic-core in one pass and returned as
+# ready-made Responses; response_model stays on each route for the OpenAPI schema.
+SUGGESTION_LIST = TypeAdapter(List[SongSuggestionInDB])
+RANKED_LIST = TypeAdapter(List[RankedSuggestion])
+
+def suggestion_response(suggestion_doc: dict, status_code: int = 200) -> Response:
+    body = SongSuggestionInDB.model_validate(suggestion_doc).model_dump_json(by_alias=True)
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
 @router.post(
     "/",
     response_model=SongSuggestionInDB,
@@ -33,85 +58,116 @@ MOCK_CLASS_ID_FOR_DEMO = "class789" # Assuming suggestions are for this class in
 async def create_suggestion(
     suggestion_data: SongSuggestionCreate = Body(...),
     suggestions_coll: AsyncIOMotorCollection = Depends(get_suggestions_collection),
-    quotas_coll: AsyncIOMotorCollection = Depends(get_quotas_collection)
-) -> SongSuggestionInDB:
+    quotas_coll: AsyncIOMotorCollection = Depends(get_quotas_collection),
+    versions_coll: AsyncIOMotorCollection = Depends(get_versions_collection),
+    suggestion_writer: Optional[SuggestionWriteBehind] = Depends(get_suggestion_writer)
+) -> Response:
 
     # --- PoC Simplification: Use hardcoded participant ID ---
     participant_id = MOCK_PARTICIPANT_ID
     logger.info(f"Received suggestion from participant (mocked): {participant_id} for class {suggestion_data.class_id}")
 
-    # --- Quota Check ---
+    # --- Quota Reservation ---
+    # Atomically take one suggestion from the quota; the filter only matches while some remain.
     current_month_year = datetime.utcnow().strftime("%Y-%m")
     quota_filter = {"user_id": participant_id, "month_year": current_month_year}
-    quota_record = await quotas_coll.find_one(quota_filter)
+    quota_record = await quotas_coll.find_one_and_update(
+        {**quota_filter, "remaining_quota": {"$gt": 0}},
+        {"$inc": {"remaining_quota": -1}},
+        return_document=ReturnDocument.AFTER
+    )
 
-    if not quota_record or quota_record.get("remaining_quota", 0) <= 0:
+    if not quota_record:
         logger.warning(f"Quota exceeded or not found for user {participant_id} for {current_month_year}.")
         raise HTTPException(status_code=403, detail="No suggestion quota remaining for this month.")
 
-    logger.info(f"User {participant_id} has {quota_record.get('remaining_quota')} suggestions remaining.")
+    logger.info(f"Reserved quota for user {participant_id}. Remaining: {quota_record.get('remaining_quota')}")
+    # The remaining quota changed now, whatever happens to the suggestion
+    await bump_quota(versions_coll, participant_id)
 
     # --- Create Suggestion Document ---
     # PoC Simplification: Use hardcoded instructor ID based on class or just mock ID
     instructor_id = MOCK_INSTRUCTOR_ID # In reality, look this up based on suggestion_data.class_id
 
-    suggestion_doc = SongSuggestionInDB(
+    # The input was validated by SongSuggestionCreate; the response is validated by suggestion_response
+    suggestion = SuggestionRecord(
+        id=ObjectId(),
         participant_id=participant_id,
         instructor_id=instructor_id, # Hardcoded for PoC
         suggestion_date=datetime.utcnow(),
         status='pending',
         # Spread data from the input model
-        **suggestion_data.dict()
+        **suggestion_data.model_dump()
     )
 
+    # --- Write-Behind Mode: queue the insert, it is flushed in batches ---
+    if suggestion_writer:
+        if not await suggestion_writer.submit(suggestion, quota_filter):
+            await _refund_quota(quotas_coll, versions_coll, quota_filter)
+            raise HTTPException(status_code=503, detail="Too many suggestions right now. Please try again shortly.")
+        logger.info(f"Suggestion {suggestion.id} queued for write-behind.")
+        # Listings and recommendations are updated by the writer once the batch is actually stored
+        return suggestion_response(suggestion.to_doc(), status_code=201)
+
     # --- Insert into DB ---
     try:
-        insert_result = await suggestions_coll.insert_one(suggestion_doc.dict(by_alias=True)) # Use by_alias for _id
+        suggestion_doc = suggestion.to_doc()
+        insert_result = await suggestions_coll.insert_one(suggestion_doc)
         if not insert_result.acknowledged or not insert_result.inserted_id:
              raise Exception("Failed to insert suggestion into database.")
         logger.info(f"Suggestion {insert_result.inserted_id} created successfully.")
+        await bump_suggestions(versions_coll, [suggestion_doc])
+    except Exception as e:
+        logger.exception(f"Error creating suggestion: {e}")
+        await _refund_quota(quotas_coll, versions_coll, quota_filter)
+        raise HTTPException(status_code=500, detail="Failed to save suggestion.")
 
-        # --- Decrement Quota ---
-        update_result = await quotas_coll.update_one(
-            quota_filter,
-            {"$inc": {"remaining_quota": -1}}
-        )
-        if update_result.modified_count != 1:
-            # This is problematic - suggestion created but quota not decremented. Log error.
-            # In production, might need compensation logic (e.g., delete suggestion or retry quota update)
-            logger.error(f"CRITICAL: Failed to decrement quota for user {participant_id} after creating suggestion {insert_result.inserted_id}")
-            # Proceed for PoC, but flag this as important
-        else:
-             logger.info(f"Decremented quota for user {participant_id}. Remaining: {quota_record.get('remaining_quota') - 1}")
-
-
-        # Fetch the created document to return it with the generated ID
-        created_suggestion = await suggestions_coll.find_one({"_id": insert_result.inserted_id})
-        if created_suggestion:
-             # Use ** to unpack dict into the Pydantic model for validation and response
-            return SongSuggestionInDB(**created_suggestion)
-        else:
-             # Should not happen if insert succeeded, but handle defensively
-             logger.error(f"Failed to fetch created suggestion {insert_result.inserted_id} after insert.")
-             raise HTTPException(status_code=500, detail="Suggestion created but could not be retrieved.")
+    # Stored now; nothing after this point may refund the quota
+    from recommendations import record_suggestions
+    record_suggestions([suggestion_doc])
+    # The document we inserted is what we return; no need to read it back
+    return suggestion_response(suggestion_doc, status_code=201)
 
+
+async def _refund_quota(quotas_coll: AsyncIOMotorCollection, versions_coll: AsyncIOMotorCollection, quota_filter: dict):
+    """Gives back a reserved suggestion when the suggestion itself could not be stored."""
+    try:
+        await quotas_coll.update_one(quota_filter, {"$inc": {"remaining_quota": 1}})
     except Exception as e:
-        logger.exception(f"Error creating suggestion or decrementing quota: {e}")
-        raise HTTPException(status_code=500, detail="Failed to save suggestion.")
+        logger.error(f"CRITICAL: Failed to refund quota {quota_filter}: {e}")
+    await bump_quota(versions_coll, quota_filter["user_id"])
 
 
 @router.get(
     "/",
     response_model=List[SongSuggestionInDB],
     summary="Get song suggestions",
-    description="Retrieves a list of suggestions, optionally filtered."
+    description="Retrieves a list of suggestions, optionally filtered. Archived suggestions are included "
+                "only when `since` reaches back past the archive cutoff."
 )
 async def get_suggestions(
+    request: Request,
     instructor_id: Optional[str] = Query(None, description="Filter by instructor ID"),
     class_id: Optional[str] = Query(None, description="Filter by class ID"),
     status: Optional[str] = Query(None, description="Filter by status (pending, approved, rejected)"),
-    suggestions_coll: AsyncIOMotorCollection = Depends(get_suggestions_collection)
-) -> List[SongSuggestionInDB]:
+    since: Optional[datetime] = Query(None, description="Only suggestions made at or after this time"),
+    until: Optional[datetime] = Query(None, description="Only suggestions made at or before this time"),
+    suggestions_coll: AsyncIOMotorCollection = Depends(get_suggestions_read_collection),
+    versions_coll: AsyncIOMotorCollection = Depends(get_versions_read_collection),
+    session: AsyncIOMotorClientSession = Depends(get_read_session)
+) -> Response:
+    # --- Conditional GET: answer from the version counter alone when nothing changed ---
+    # The version is read before the documents, with the same read preference and in one causally
+    # consistent session, so the documents are at least as new as the version (a concurrent write
+    # can only make the ETag older), even when reads go to a lagging secondary.
+    etag = await make_etag(
+        versions_coll, suggestions_key(instructor_id, class_id), instructor_id, class_id, status, since, until,
+        session=session
+    )
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
     query_filter = {}
     if instructor_id:
         query_filter["instructor_id"] = instructor_id
@@ -120,14 +176,49 @@ async def get_suggestions(
     if status and status in ['pending', 'approved', 'rejected']:
         query_filter["status"] = status
 
-    logger.info(f"Fetching suggestions with filter: {query_filter}")
-    suggestions_cursor = suggestions_coll.find(query_filter).sort("suggestion_date", -1) # Sort newest first
-    suggestions_list = await suggestions_cursor.to_list(length=100) # Limit length for safety
+    logger.info(f"Fetching suggestions with filter: {query_filter}, since: {since}, until: {until}")
+    # Sorted newest first; limit length for safety
+    suggestions_list = await find_suggestions_in_range(suggestions_coll, query_filter, since, until, limit=100, session=session)
 
-    # Convert MongoDB docs to Pydantic models for response validation
-    # Pydantic V2 handles the alias automatically if configured in model
-    # Pydantic V1 might need manual mapping or `parse_obj_as`
-    return [SongSuggestionInDB(**s) for s in suggestions_list]
+    # The documents are validated (the _id alias maps to id) and serialized once on the way out
+    rows = SUGGESTION_LIST.validate_python(suggestions_list)
+    return Response(content=SUGGESTION_LIST.dump_json(rows, by_alias=True), media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/ranked",
+    response_model=List[RankedSuggestion],
+    summary="Get ranked pending suggestions for a class",
+    description="Scores a class's pending suggestions by votes, recency, participant history and artist "
+                "diversity, and returns the top K tracks."
+)
+async def get_ranked_suggestions(
+    class_id: str = Query(..., description="The class whose review queue to rank"),
+    k: int = Query(20, ge=1, le=500, description="Number of tracks to return"),
+    suggestions_coll: AsyncIOMotorCollection = Depends(get_suggestions_read_collection)
+) -> Response:
+    from ranking import rank_class_suggestions
+
+    ranked = await rank_class_suggestions(suggestions_coll, class_id, k)
+    rows = RANKED_LIST.validate_python(
+        [{**doc, "votes": track.votes, "score": track.score} for track, doc in ranked]
+    )
+    return Response(content=RANKED_LIST.dump_json(rows, by_alias=True), media_type="application/json")
+
+
+@router.get(
+    "/similar",
+    response_model=List[SimilarTrack],
+    summary="Get tracks often suggested alongside a track",
+    description="Returns tracks that were suggested for the same classes as the given track, most shared classes first."
+)
+async def get_similar_tracks(
+    spotify_uri: str = Query(..., description="The track to find companions for"),
+    limit: int = Query(10, ge=1, le=50, description="Number of tracks to return")
+) -> List[SimilarTrack]:
+    from recommendations import recommender
+
+    return [SimilarTrack(spotify_uri=uri, score=score) for uri, score in recommender.similar(spotify_uri, limit)]
 
 
 @router.patch(
@@ -139,14 +230,14 @@ async def get_suggestions(
 async def update_suggestion_status(
     suggestion_id: str = Path(..., description="The ID of the suggestion to update"),
     status_update: SongSuggestionUpdateStatus = Body(...),
-    suggestions_coll: AsyncIOMotorCollection = Depends(get_suggestions_collection)
-) -> SongSuggestionInDB:
+    suggestions_coll: AsyncIOMotorCollection = Depends(get_suggestions_collection),
+    versions_coll: AsyncIOMotorCollection = Depends(get_versions_collection)
+) -> Response:
 
     # Validate input ID format before hitting DB
-    try:
-        obj_id = PyObjectId(suggestion_id)
-    except Exception:
+    if not ObjectId.is_valid(suggestion_id):
          raise HTTPException(status_code=400, detail=f"Invalid suggestion ID format: {suggestion_id}")
+    obj_id = ObjectId(suggestion_id)
 
     logger.info(f"Attempting to update suggestion {suggestion_id} to status {status_update.status}")
 
@@ -158,7 +249,8 @@ async def update_suggestion_status(
 
     if update_result:
         logger.info(f"Suggestion {suggestion_id} updated successfully.")
-        return SongSuggestionInDB(**update_result) # Return validated updated doc
+        await bump_suggestions(versions_coll, [update_result])
+        return suggestion_response(update_result)
     else:
         logger.warning(f"Suggestion {suggestion_id} not found for update.")
         raise HTTPException(status_code=404, detail=f"Suggestion with ID {suggestion_id} not found")
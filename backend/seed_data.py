@@ -129,14 +129,14 @@ async def seed_database(db: AsyncIOMotorDatabase):
 
 # For running the script directly
 if __name__ == "__main__":
-    import os
+    from config import settings
     from database import connect_to_mongo, close_mongo_connection, get_database
     
     async def run_seeder():
         client = await connect_to_mongo()
         if client:
             try:
-                db_name = os.getenv("MONGODB_DB_NAME", "barrys_suggestions_poc")
+                db_name = settings.db_name
                 logger.info(f"Using database: {db_name}")
                 db = client[db_name]
                 await seed_database(db)
@@ -1,21 +1,18 @@
 # backend/spotify.py
-import os
+import json
 import httpx
 import base64
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
 
-# Load environment variables from .env file if not already loaded
-load_dotenv()
+from cache import get_cache
+from config import settings
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Spotify API configuration
-CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
-CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
+CLIENT_ID = settings.spotify_client_id
+CLIENT_SECRET = settings.spotify_client_secret
 TOKEN_URL = "https://accounts.spotify.com/api/token"
 API_BASE_URL = "https://api.spotify.com/v1"
 
@@ -24,17 +21,30 @@ if not CLIENT_ID or not CLIENT_SECRET:
     # Depending on requirements, you might want to raise an exception here
     # raise ValueError("Spotify API credentials not configured.")
 
-# Token cache (simple in-memory cache)
-token_info = {"access_token": None, "expires_at": None}
+# Token and search results live in the cache backend (see cache.py), so they are either
+# private to each worker process or shared between workers, depending on CACHE_BACKEND.
+TOKEN_CACHE_KEY = "spotify:token"
+SEARCH_CACHE_TTL = settings.spotify_search_cache_ttl
+
+# Only one coroutine per worker refreshes the token; the rest wait and reuse it.
+_token_lock = asyncio.Lock()
 
 async def get_token():
     """Gets a Spotify API token using Client Credentials Flow."""
-    global token_info
-    now = datetime.now()
-
-    if token_info.get("access_token") and token_info.get("expires_at") and now < token_info["expires_at"]:
-        return token_info["access_token"]
-
+    cache = get_cache()
+    access_token = await cache.get(TOKEN_CACHE_KEY)
+    if access_token:
+        return access_token
+
+    async with _token_lock:
+        # Another request may have refreshed the token while we waited for the lock
+        access_token = await cache.get(TOKEN_CACHE_KEY)
+        if access_token:
+            return access_token
+        return await _request_token()
+
+async def _request_token():
+    """Requests a new token from Spotify and stores it in the cache."""
     if not CLIENT_ID or not CLIENT_SECRET:
          logger.error("Cannot get token, Spotify credentials missing.")
          return None # Or raise an exception
@@ -56,12 +66,12 @@ async def get_token():
             response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
             response_data = response.json()
 
-            token_info["access_token"] = response_data["access_token"]
+            access_token = response_data["access_token"]
             # Subtract 60 seconds buffer for expiry
             expires_in = response_data.get("expires_in", 3600)
-            token_info["expires_at"] = now + timedelta(seconds=expires_in - 60)
+            await get_cache().set(TOKEN_CACHE_KEY, access_token, ttl=expires_in - 60)
             logger.info("Successfully obtained new Spotify API token.")
-            return token_info["access_token"]
+            return access_token
     except httpx.RequestError as exc:
         logger.error(f"An error occurred while requesting Spotify token {exc.request.url!r}: {exc}")
         return None
@@ -75,6 +85,12 @@ async def get_token():
 
 async def search_spotify(query: str, limit: int = 10):
     """Searches Spotify for tracks matching the query."""
+    cache = get_cache()
+    cache_key = f"spotify:search:{limit}:{query.strip().lower()}"
+    cached_results = await cache.get(cache_key)
+    if cached_results:
+        return json.loads(cached_results)
+
     token = await get_token()
     if not token:
         logger.error("Failed to search Spotify: Could not get API token.")
@@ -87,6 +103,7 @@ async def search_spotify(query: str, limit: int = 10):
         async with httpx.AsyncClient() as client:
             response = await client.get(f"{API_BASE_URL}/search", headers=headers, params=params)
             response.raise_for_status()
+            await cache.set(cache_key, response.text, ttl=SEARCH_CACHE_TTL)
             return response.json()
     except httpx.RequestError as exc:
         logger.error(f"An error occurred while searching Spotify {exc.request.url!r}: {exc}")
@@ -0,0 +1,67 @@
+# backend/tests/test_archive.py
+#
+#   cd backend && python -m pytest tests
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import archive
+from archive import archive_collection_name, archive_cutoff, find_suggestions_in_range
+
+
+class FakeCursor:
+    def __init__(self, docs: list[dict]):
+        self.docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, database, name: str, docs: list[dict]):
+        self.database, self.name, self.docs = database, name, docs
+        self.read_preference = None
+
+    def find(self, query_filter, session=None):
+        self.database.queried.append(self.name)
+        return FakeCursor(self.docs)
+
+
+class FakeDatabase:
+    def __init__(self, archive_names: list[str]):
+        self.archive_names = archive_names
+        self.queried: list[str] = []
+
+    async def list_collection_names(self, filter=None):
+        return self.archive_names
+
+    def get_collection(self, name: str, read_preference=None):
+        return FakeCollection(self, name, [{"_id": name, "suggestion_date": datetime(2000, 1, 1)}])
+
+
+@pytest.fixture(autouse=True)
+def fresh_archive_names(monkeypatch):
+    monkeypatch.setattr(archive, "_archive_names_loaded_at", float("-inf"))
+
+
+def test_ancient_since_only_queries_existing_archives():
+    cutoff = archive_cutoff()
+    existing = [archive_collection_name(cutoff - timedelta(days=40)), archive_collection_name(cutoff - timedelta(days=400))]
+    db = FakeDatabase(existing)
+    suggestions = FakeCollection(db, "suggestions", [])
+
+    docs = asyncio.run(find_suggestions_in_range(suggestions, {}, since=datetime(1, 1, 1)))
+
+    assert sorted(db.queried) == sorted(["suggestions", *existing])
+    assert len(docs) == 2
+
+
+def test_no_archives_queries_only_hot_collection():
+    db = FakeDatabase([])
+    suggestions = FakeCollection(db, "suggestions", [])
+    asyncio.run(find_suggestions_in_range(suggestions, {}, since=datetime(1, 1, 1)))
+    assert db.queried == ["suggestions"]
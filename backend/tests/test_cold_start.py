@@ -0,0 +1,31 @@
+# backend/tests/test_cold_start.py
+# Startup-time regression check: importing the app and answering the first request must stay
+# within the cold start budgets, also when MongoDB is unreachable.
+#
+#   cd backend && python -m pytest tests
+import socket
+
+import pytest
+
+from benchmarks.bench_cold_start import FIRST_REQUEST_BUDGET, IMPORT_BUDGET, measure_first_request, measure_import
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def unreachable_mongo(monkeypatch):
+    # Nothing listens on the port we just freed; server selection would wait longer than the
+    # budget, so this only passes while STARTUP_CHECK_TIMEOUT bounds the startup check
+    monkeypatch.setenv("MONGODB_URI", f"mongodb://127.0.0.1:{free_port()}/?serverSelectionTimeoutMS=10000")
+
+
+def test_import_within_budget(unreachable_mongo):
+    assert measure_import() < IMPORT_BUDGET
+
+
+def test_first_request_within_budget(unreachable_mongo):
+    assert measure_first_request(free_port()) < FIRST_REQUEST_BUDGET
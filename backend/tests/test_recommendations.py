@@ -0,0 +1,42 @@
+# backend/tests/test_recommendations.py
+#
+#   cd backend && python -m pytest tests
+from recommendations import CooccurrenceRecommender, build_snapshot
+
+
+def make_recommender(tmp_path, baskets: dict[str, list[str]]) -> CooccurrenceRecommender:
+    recommender = CooccurrenceRecommender(str(tmp_path), neighbours=10)
+    recommender.publish(build_snapshot(baskets, recommender.neighbours))
+    recommender.reload()
+    return recommender
+
+
+def test_non_ascii_uris_build_and_look_up(tmp_path):
+    recommender = make_recommender(tmp_path, {"class_1": ["spotify:track:café", "spotify:track:b"]})
+    assert recommender.similar("spotify:track:café") == [("spotify:track:b", 1.0)]
+    assert recommender.similar("spotify:track:b") == [("spotify:track:café", 1.0)]
+
+
+def test_new_track_pairs_with_tracks_already_in_snapshot(tmp_path):
+    recommender = make_recommender(tmp_path, {"class_1": ["a", "b", "c"]})
+    recommender.record_suggestion("class_1", "x")
+    assert sorted(recommender.similar("x")) == [("a", 1.0), ("b", 1.0), ("c", 1.0)]
+    assert dict(recommender.similar("a"))["x"] == 1.0
+
+
+def test_resuggesting_known_track_does_not_double_count(tmp_path):
+    recommender = make_recommender(tmp_path, {"class_1": ["a", "b", "c"]})
+    recommender.record_suggestion("class_1", "a")
+    recommender.record_suggestion("class_1", "x")
+    recommender.record_suggestion("class_1", "x")
+    assert dict(recommender.similar("a")) == {"b": 1.0, "c": 1.0, "x": 1.0}
+
+
+def test_record_suggestions_logs_instead_of_raising(monkeypatch):
+    import recommendations
+
+    def broken(class_id, spotify_uri):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(recommendations.recommender, "record_suggestion", broken)
+    recommendations.record_suggestions([{"class_id": "class_1", "spotify_uri": "a"}])
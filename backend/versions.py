@@ -0,0 +1,95 @@
+# backend/versions.py
+# Version counters behind the ETags of GET /suggestions and GET /quota/{user_id}.
+#
+# Every write that changes what a listing returns bumps the counters of the scopes it touches
+# (all suggestions, the suggestion's instructor, the suggestion's class; or a user's quota).
+# A GET reads one counter, builds the ETag from it and can answer If-None-Match with a 304
+# without reading any suggestion or quota documents. Counters live in MongoDB so all workers
+# agree on them.
+import hashlib
+import logging
+from typing import Iterable, Optional
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+ALL_SUGGESTIONS_KEY = "suggestions"
+
+# Sent with every ETag: clients may keep responses but must revalidate (If-None-Match) before reusing them
+CACHE_CONTROL = "no-cache"
+
+
+def suggestions_key(instructor_id: Optional[str] = None, class_id: Optional[str] = None) -> str:
+    """Counter covering a suggestions listing; the narrowest scope its filter allows."""
+    if instructor_id:
+        return f"suggestions:instructor:{instructor_id}"
+    if class_id:
+        return f"suggestions:class:{class_id}"
+    return ALL_SUGGESTIONS_KEY
+
+def quota_key(user_id: str) -> str:
+    return f"quota:{user_id}"
+
+
+# --- Bumping ---
+async def bump(versions_coll: AsyncIOMotorCollection, keys: Iterable[str]):
+    """Increments the given counters in one round trip. Failures are logged, never raised."""
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    try:
+        await versions_coll.bulk_write(
+            [UpdateOne({"_id": key}, {"$inc": {"v": 1}}, upsert=True) for key in keys],
+            ordered=False
+        )
+    except Exception as e:
+        logger.error(f"Failed to bump cache versions {keys}: {e}")
+
+def suggestion_keys(suggestion_docs: Iterable[dict]) -> set[str]:
+    """Every listing scope that the given (new, changed or removed) suggestions appear in."""
+    keys = {ALL_SUGGESTIONS_KEY}
+    for doc in suggestion_docs:
+        if doc.get("instructor_id"):
+            keys.add(suggestions_key(instructor_id=doc["instructor_id"]))
+        if doc.get("class_id"):
+            keys.add(suggestions_key(class_id=doc["class_id"]))
+    return keys
+
+async def bump_suggestions(versions_coll: AsyncIOMotorCollection, suggestion_docs: Iterable[dict]):
+    await bump(versions_coll, suggestion_keys(suggestion_docs))
+
+async def bump_quota(versions_coll: AsyncIOMotorCollection, user_id: str):
+    await bump(versions_coll, [quota_key(user_id)])
+
+
+# --- ETags ---
+async def read_version(versions_coll: AsyncIOMotorCollection, key: str, session: Optional[AsyncIOMotorClientSession] = None) -> int:
+    doc = await versions_coll.find_one({"_id": key}, session=session)
+    return doc["v"] if doc else 0
+
+async def make_etag(
+    versions_coll: AsyncIOMotorCollection,
+    key: str,
+    *filter_parts,
+    session: Optional[AsyncIOMotorClientSession] = None,
+) -> str:
+    """Weak ETag from the counter's version and the request's filter parameters.
+
+    Weak, because the same content may be sent gzip/brotli-encoded or not. Read the counter
+    with the same read preference as the documents it tags, and read both in one causally
+    consistent `session` (database.get_read_session), so the documents are never older than
+    the version.
+    """
+    version = await read_version(versions_coll, key, session)
+    digest = hashlib.blake2b(repr(filter_parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header covers `etag` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
@@ -0,0 +1,199 @@
+# backend/write_behind.py
+import asyncio
+import logging
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError
+
+from config import settings
+from records import SuggestionRecord
+from versions import bump, suggestion_keys, quota_key
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+MAX_FLUSH_ATTEMPTS = 3
+
+
+class SuggestionWriteBehind:
+    """Queues suggestions in-process and inserts them in batches.
+
+    Suggestions are queued only after their quota has been reserved, so a queued suggestion
+    is already "accepted". Each batch is written with insert_many(ordered=False); suggestions
+    that can't be written get their reserved quota refunded.
+    """
+
+    def __init__(
+        self,
+        suggestions_coll: AsyncIOMotorCollection,
+        quotas_coll: AsyncIOMotorCollection,
+        versions_coll: AsyncIOMotorCollection,
+        batch_size: int,
+        flush_ms: int,
+        max_pending: int,
+        enqueue_timeout: float,
+    ):
+        self.suggestions_coll = suggestions_coll
+        self.quotas_coll = quotas_coll
+        self.versions_coll = versions_coll
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.enqueue_timeout = enqueue_timeout
+        # Each item is (suggestion, quota filter to refund on failure)
+        self._queue: asyncio.Queue[tuple[SuggestionRecord, dict]] = asyncio.Queue(maxsize=max_pending)
+        self._task: asyncio.Task | None = None
+        self._batch: list[tuple[SuggestionRecord, dict]] = [] # Taken off the queue, not yet flushing
+        self._inflight: asyncio.Future | None = None # Batch currently being written
+        self._accepting = False
+
+    def start(self):
+        self._accepting = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Suggestion write-behind started (batch {self.batch_size}, every {self.flush_interval * 1000:.0f} ms).")
+
+    async def submit(self, suggestion: SuggestionRecord, quota_filter: dict) -> bool:
+        """Queues a suggestion. Returns False if the queue stayed full (caller should refund and reject)."""
+        if not self._accepting:
+            return False
+        try:
+            await asyncio.wait_for(self._queue.put((suggestion, quota_filter)), self.enqueue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Write-behind queue full ({self._queue.maxsize} pending); rejecting suggestion.")
+            return False
+
+    async def stop(self):
+        """Stops accepting suggestions and flushes everything still queued."""
+        self._accepting = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Finish the batch being written, then the one being collected, then the queue
+        if self._inflight:
+            await self._inflight
+            self._inflight = None
+        batch, self._batch = self._batch, []
+        await self._flush(batch)
+        while not self._queue.empty():
+            await self._flush(self._take_batch())
+        logger.info("Suggestion write-behind stopped; queue drained.")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(self._batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            batch, self._batch = self._batch, []
+            # Shield the write so cancellation on shutdown doesn't interrupt it; stop() awaits it
+            self._inflight = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._inflight)
+            self._inflight = None
+
+    def _take_batch(self) -> list[tuple[SuggestionRecord, dict]]:
+        batch = []
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _missing_indexes(self, docs: list[dict]) -> set[int]:
+        """Indexes of `docs` not found in the collection (all of them if that can't be checked)."""
+        try:
+            stored_ids = {
+                doc["_id"]
+                async for doc in self.suggestions_coll.find({"_id": {"$in": [doc["_id"] for doc in docs]}}, {"_id": 1})
+            }
+        except Exception as e:
+            logger.error(f"CRITICAL: Could not check which queued suggestions were stored: {e}")
+            return set(range(len(docs)))
+        return {index for index, doc in enumerate(docs) if doc["_id"] not in stored_ids}
+
+    async def _flush(self, batch: list[tuple[SuggestionRecord, dict]]):
+        if not batch:
+            return
+        docs = [suggestion.to_doc() for suggestion, _ in batch]
+        failed_indexes: set[int] = set()
+
+        for attempt in range(1, MAX_FLUSH_ATTEMPTS + 1):
+            try:
+                await self.suggestions_coll.insert_many(docs, ordered=False)
+                failed_indexes = set()
+                break
+            except BulkWriteError as e:
+                # Duplicate keys mean an earlier attempt already wrote the document.
+                failed_indexes = {
+                    error["index"] for error in e.details.get("writeErrors", [])
+                    if error.get("code") != DUPLICATE_KEY_ERROR
+                }
+                break
+            except Exception as e:
+                logger.error(f"Write-behind flush of {len(docs)} suggestions failed (attempt {attempt}): {e}")
+                await asyncio.sleep(0.1 * attempt)
+        else:
+            # No attempt gave a per-document answer, and an unordered insert_many may have stored
+            # some documents before failing; only the missing ones are failed.
+            failed_indexes = await self._missing_indexes(docs)
+
+        if failed_indexes:
+            logger.error(f"CRITICAL: {len(failed_indexes)} queued suggestions could not be written; refunding quota.")
+            for index in failed_indexes:
+                suggestion, quota_filter = batch[index]
+                logger.error(f"Dropped suggestion: {suggestion}")
+                try:
+                    await self.quotas_coll.update_one(quota_filter, {"$inc": {"remaining_quota": 1}})
+                except Exception as e:
+                    logger.error(f"CRITICAL: Failed to refund quota {quota_filter}: {e}")
+
+        # Listings containing the stored suggestions (and refunded quotas) have changed
+        stored = [doc for index, doc in enumerate(docs) if index not in failed_indexes]
+        refunded_users = {batch[index][1].get("user_id") for index in failed_indexes}
+        await bump(
+            self.versions_coll,
+            (suggestion_keys(stored) if stored else set()) | {quota_key(user) for user in refunded_users if user}
+        )
+        # Only stored suggestions count towards "also suggested" (imported here: NumPy)
+        from recommendations import record_suggestions
+        record_suggestions(stored)
+        logger.debug(f"Flushed {len(docs) - len(failed_indexes)} suggestions.")
+
+
+# --- Write-Behind Instance ---
+# One per worker process, created in the app lifespan when SUGGESTION_WRITE_BEHIND is enabled.
+suggestion_writer: SuggestionWriteBehind | None = None
+
+def start_suggestion_writer(
+    suggestions_coll: AsyncIOMotorCollection,
+    quotas_coll: AsyncIOMotorCollection,
+    versions_coll: AsyncIOMotorCollection,
+):
+    global suggestion_writer
+    suggestion_writer = SuggestionWriteBehind(
+        suggestions_coll,
+        quotas_coll,
+        versions_coll,
+        batch_size=settings.write_behind_batch_size,
+        flush_ms=settings.write_behind_flush_ms,
+        max_pending=settings.write_behind_max_pending,
+        enqueue_timeout=settings.write_behind_enqueue_timeout,
+    )
+    suggestion_writer.start()
+
+async def stop_suggestion_writer():
+    global suggestion_writer
+    if suggestion_writer:
+        await suggestion_writer.stop()
+        suggestion_writer = None
+
+def get_suggestion_writer() -> SuggestionWriteBehind | None:
+    """Dependency returning the write-behind queue, or None when inserts are synchronous."""
+    return suggestion_writer
@@ -80,6 +80,36 @@ const apiClient = axios.create({
 });
 
 
+// --- Conditional GET cache ---
+// Remembers the ETag and data of the last response per URL + params. The next request sends
+// If-None-Match; on 304 the previous data object is returned as-is, so React sees the same
+// reference and skips re-rendering.
+interface ETagEntry<T> {
+    etag: string;
+    data: T;
+}
+
+const etagCache = new Map<string, ETagEntry<unknown>>();
+
+const getWithETag = async <T>(url: string, params?: Record<string, string | undefined>): Promise<T> => {
+    const cacheKey = `${url}?${JSON.stringify(params ?? {})}`;
+    const cached = etagCache.get(cacheKey) as ETagEntry<T> | undefined;
+    const response = await apiClient.get<T>(url, {
+        params,
+        headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+        validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    });
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+    const etag = response.headers['etag'];
+    if (etag) {
+        etagCache.set(cacheKey, { etag, data: response.data });
+    }
+    return response.data;
+};
+
+
 const api = {
   // --- Spotify search proxy (Already implemented) ---
   searchSongs: async (query: string): Promise<Song[]> => {
@@ -151,10 +181,10 @@ const api = {
           params.status = statusFilter;
       }
       // Calls GET http://localhost:8000/suggestions?instructor_id=...&status=...
-      const response = await apiClient.get<SongSuggestion[]>('/suggestions/', { params }); // Note trailing slash
+      // Note trailing slash. Unchanged lists come back as 304 and reuse the cached array.
       // Backend now returns the correct flat structure (SongSuggestionInDB),
       // which matches our frontend SongSuggestion type.
-      return response.data;
+      return await getWithETag<SongSuggestion[]>('/suggestions/', params);
     } catch (error) {
         if (axios.isAxiosError(error)) { console.error('Axios error getting suggestions:', error.message, error.response?.data); }
         else { console.error('Generic error getting suggestions:', error); }
@@ -168,8 +198,8 @@ const api = {
     try {
       console.log(`Checking quota via backend for user: ${userId}`);
       // Calls GET http://localhost:8000/quota/{userId}
-      const response = await apiClient.get<QuotaRecord>(`/quota/${userId}`);
-      return response.data.remaining_quota;
+      const quota = await getWithETag<QuotaRecord>(`/quota/${userId}`);
+      return quota.remaining_quota;
     } catch (error) {
       if (axios.isAxiosError(error)) {
           // Handle 404 specifically if backend returns that when no record exists